@@ -0,0 +1,106 @@
+import os
+
+
+class DiskUsage:
+    """Disk-usage aggregation per checkpoints root, model type and directory.
+
+    Each group tracks apparent size, allocated size (st_blocks) and file count. Totals are
+    hardlink-aware: for files with several links (st_nlink > 1 when they were indexed) every
+    group remembers how many of its paths point at the inode and only counts its bytes once;
+    single-link files need no bookkeeping. add()/remove() keep the aggregates current, and
+    sync() applies only the difference between two scans. The groups of a folder (total, root
+    and every parent directory) are computed once per folder.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self.links = {}
+        self.dir_groups = {}
+        self.rankings = None
+
+    def sync(self, old_models, new_models):
+        """Move the aggregates from old_models (what they reflect now) to new_models."""
+        before = {(m.dir, m.name): m for m in old_models}
+        for m in new_models:
+            prev = before.pop((m.dir, m.name), None)
+            if prev is not None:
+                if self.same_usage(prev, m):
+                    continue
+                self.remove(prev)
+            self.add(m)
+        for m in before.values():
+            self.remove(m)
+
+    @staticmethod
+    def same_usage(a, b):
+        return (a.size == b.size and a.alloc == b.alloc and a.type_code == b.type_code and a.base_dir == b.base_dir
+                and a.ino == b.ino and a.dev == b.dev and a.nlink == b.nlink)
+
+    def groups_for(self, m):
+        key = (m.base_dir, m.dir)
+        groups = self.dir_groups.get(key)
+        if groups is None:
+            groups = [("total", ""), ("root", m.base_dir)]
+            rel_dir = os.path.dirname(m.rel_path)
+            while rel_dir:
+                groups.append(("dir", os.path.join(m.base_dir, rel_dir)))
+                rel_dir = os.path.dirname(rel_dir)
+            groups = self.dir_groups[key] = tuple(groups)
+        return groups + (("type", m.model_type),)
+
+    def update(self, m, sign):
+        # Platforms without inode numbers report 0: such files are never treated as links
+        file_id = (m.dev, m.ino) if m.nlink > 1 and m.ino else None
+        for group in self.groups_for(m):
+            stats = self.stats.get(group)
+            if stats is None:
+                stats = self.stats[group] = [0, 0, 0]
+            stats[2] += sign
+            counted = True
+            if file_id is not None:
+                counts = self.links.get(group)
+                if counts is None:
+                    counts = self.links[group] = {}
+                count = counts.get(file_id, 0) + sign
+                if count > 0:
+                    counts[file_id] = count
+                else:
+                    counts.pop(file_id, None)
+                    if not counts:
+                        del self.links[group]
+                # Bytes change only when the first link appears or the last one goes away
+                counted = (sign > 0 and count == 1) or (sign < 0 and count == 0)
+            if counted:
+                stats[0] += sign * m.size
+                stats[1] += sign * m.alloc
+            if stats[2] <= 0:
+                del self.stats[group]
+                self.links.pop(group, None)
+        self.rankings = None
+
+    def add(self, m):
+        self.update(m, 1)
+
+    def remove(self, m):
+        self.update(m, -1)
+
+    def rank(self):
+        """Sort every group kind by apparent size, largest first."""
+        rankings = {}
+        for (kind, key), stats in self.stats.items():
+            rankings.setdefault(kind, []).append((key, stats[0], stats[1], stats[2]))
+        for rows in rankings.values():
+            rows.sort(key=lambda r: r[1], reverse=True)
+        self.rankings = rankings
+        return rankings
+
+    def freeze(self):
+        """(totals, rankings) for a published snapshot; later add()/remove() calls do not touch them."""
+        rankings = self.rankings if self.rankings is not None else self.rank()
+        return self.totals(), rankings
+
+    def totals(self):
+        """(apparent, allocated, files, extra paths that are hardlinks to an already counted file)."""
+        apparent, alloc, files = self.stats.get(("total", ""), (0, 0, 0))
+        linked = sum(count - 1 for count in self.links.get(("total", ""), {}).values())
+        return apparent, alloc, files, linked
@@ -0,0 +1,299 @@
+"""Scanner and renderer benchmarks, runnable without Wan2GP or a GPU.
+
+Generates a synthetic tree (or uses --root), then times cold/warm/forced scans, per-keystroke
+filter latency in both views, sorting, HTML payload sizes and peak memory. Results are JSON so
+runs of different versions can be compared:
+
+    python benchmarks/run_benchmarks.py --files 2000 --loras 10000 -o before.json
+    python benchmarks/run_benchmarks.py --files 2000 --loras 10000 -o after.json --compare before.json
+
+The plugin is driven through its original public methods (scan_models, render_model_list,
+render_detailed_list, get_stats_html, get_unique_types), so the script also runs against the first
+release; anything newer (data_dir, forced scans, size table, disk usage) is feature-detected and
+its results are left out when missing.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import types
+import shutil
+import platform
+import inspect
+import argparse
+import tempfile
+import functools
+import statistics
+import tracemalloc
+import importlib.util
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from synthetic_tree import generate_tree
+
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KEYSTROKE_QUERIES = ["style_lora_00", "wan2_1", "d1_2/"]
+
+
+def install_stubs():
+    """Stand-ins for the Wan2GP plugin base class (and Gradio when missing); rendering never calls them."""
+    try:
+        import shared.utils.plugins  # noqa: F401
+    except ImportError:
+        class WAN2GPPlugin:
+            def __init__(self):
+                self.tabs = []
+
+            def request_global(self, name):
+                pass
+
+            def add_tab(self, **kwargs):
+                self.tabs.append(kwargs)
+
+            def add_custom_js(self, js):
+                pass
+
+        for name in ("shared", "shared.utils"):
+            sys.modules.setdefault(name, types.ModuleType(name))
+        plugins = types.ModuleType("shared.utils.plugins")
+        plugins.WAN2GPPlugin = WAN2GPPlugin
+        sys.modules["shared.utils.plugins"] = plugins
+    try:
+        import gradio  # noqa: F401
+    except ImportError:
+        gradio = types.ModuleType("gradio")
+        gradio.update = lambda **kwargs: kwargs
+        sys.modules["gradio"] = gradio
+
+
+def load_plugin_class():
+    """Import the plugin folder as a package (its directory name is not a valid module name)."""
+    install_stubs()
+    spec = importlib.util.spec_from_file_location("model_manager", os.path.join(PLUGIN_DIR, "__init__.py"),
+                                                  submodule_search_locations=[PLUGIN_DIR])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules["model_manager"] = package
+    spec.loader.exec_module(package)
+    from model_manager.plugin import ModelManagerPlugin
+    return ModelManagerPlugin
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {"runs": len(samples), "min_ms": round(samples[0] * 1000, 3),
+            "median_ms": round(statistics.median(samples) * 1000, 3),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+            "max_ms": round(samples[-1] * 1000, 3)}
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def accepts(fn, name):
+    return name in inspect.signature(fn).parameters
+
+
+def model_path(m):
+    """Models are ModelRecords in newer versions, dicts in the original plugin."""
+    return m["path"] if isinstance(m, dict) else m.path
+
+
+def new_plugin(plugin_class, data_dir, root):
+    """A plugin that only scans root. Versions without data_dir keep no files and read default_model_dirs."""
+    if accepts(plugin_class.__init__, "data_dir"):
+        plugin = plugin_class(data_dir=data_dir, model_dirs=[root])
+    else:
+        plugin = plugin_class()
+        plugin.default_model_dirs = [root]
+    plugin.watch_backend = None
+    return plugin
+
+
+def fresh_plugin(plugin_class, data_dir, root):
+    """A new instance and its (warm) scan, so the next queries start without any cached index."""
+    plugin = new_plugin(plugin_class, data_dir, root)
+    return plugin, plugin.scan_models()
+
+
+def bench_scans(plugin_class, root, data_dir, repeat):
+    seconds, models = timed(new_plugin(plugin_class, data_dir, root).scan_models)
+    results = {"cold": summarize([seconds]), "models": len(models)}
+    warm = []
+    for _ in range(repeat):
+        # A fresh instance each time: includes loading scan_index.json, like a Wan2GP restart
+        warm.append(timed(new_plugin(plugin_class, data_dir, root).scan_models)[0])
+    results["warm"] = summarize(warm)
+    plugin = new_plugin(plugin_class, data_dir, root)
+    # Versions without a scan index walk the whole tree every time
+    scan = functools.partial(plugin.scan_models, force=True) if accepts(plugin.scan_models, "force") else plugin.scan_models
+    results["forced"] = summarize([timed(scan)[0] for _ in range(repeat)])
+    return results
+
+
+def bench_keystrokes(plugin_class, root, data_dir, repeat):
+    """Type each query one character at a time, as the search box does, in both views."""
+    results = {}
+    for view in ("grid", "list"):
+        samples = []
+        for _ in range(repeat):
+            plugin, models = fresh_plugin(plugin_class, data_dir, root)
+            for query in KEYSTROKE_QUERIES:
+                for i in range(1, len(query) + 1):
+                    start = time.perf_counter()
+                    if view == "grid":
+                        _, filtered = plugin.render_model_list(models, "size", query[:i], "All")
+                    else:
+                        _, filtered = plugin.render_detailed_list(models, set(), "size", query[:i], "All")
+                    plugin.get_stats_html(filtered, set())
+                    samples.append(time.perf_counter() - start)
+        results[view] = summarize(samples)
+    return results
+
+
+def bench_sorts(plugin_class, root, data_dir, repeat):
+    results = {}
+    for sort_by in ("size", "name", "date"):
+        first = []
+        cached = []
+        for _ in range(repeat):
+            plugin, models = fresh_plugin(plugin_class, data_dir, root)
+            first.append(timed(plugin.render_model_list, models, sort_by)[0])
+            cached.append(timed(plugin.render_model_list, models, sort_by)[0])
+        results[sort_by] = {"first": summarize(first), "cached": summarize(cached)}
+    types_samples = [timed(plugin.render_model_list, models, "size", "", t)[0]
+                     for t in plugin.get_unique_types(models)[1:] for _ in range(repeat)]
+    results["type_filter"] = summarize(types_samples)
+    return results
+
+
+def bench_payloads(plugin, models):
+    choices, filtered = plugin.render_model_list(models)
+    list_html, _ = plugin.render_detailed_list(models, set())
+    selected = {model_path(m) for m in models[:50]}
+    results = {
+        "grid_choices_bytes": len(json.dumps(choices).encode()),
+        "list_page_bytes": len(list_html.encode()),
+        "stats_bytes": len(plugin.get_stats_html(filtered, selected).encode()),
+    }
+    if hasattr(plugin, "render_size_table"):
+        results["size_table_bytes"] = len(plugin.render_size_table(models).encode())
+    if hasattr(plugin, "render_disk_usage"):
+        results["disk_usage_bytes"] = len(plugin.render_disk_usage().encode())
+    return results
+
+
+def bench_memory(plugin_class, root):
+    """Peak and retained Python heap of a cold scan (separate run: tracemalloc slows everything down)."""
+    data_dir = tempfile.mkdtemp(prefix="mm-bench-mem-")
+    try:
+        gc.collect()
+        tracemalloc.start()
+        plugin = new_plugin(plugin_class, data_dir, root)
+        plugin.scan_models()
+        plugin.render_model_list(plugin.models_cache)
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+    results = {"scan_peak_bytes": peak, "retained_bytes": current}
+    try:
+        import resource
+        # ru_maxrss is KiB on Linux
+        results["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        pass
+    return results
+
+
+def flatten(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(results, baseline_file, threshold):
+    """Print medians and sizes that changed by more than threshold against a previous results file."""
+    with open(baseline_file, "r", encoding="utf-8") as f:
+        baseline = flatten(json.load(f)["results"])
+    current = flatten(results["results"])
+    regressions = 0
+    for key in sorted(current):
+        old, new = baseline.get(key), current[key]
+        # min/max/p95 of a few runs are too noisy to gate on
+        if not old or not key.endswith(("median_ms", "bytes")):
+            continue
+        ratio = new / old
+        if abs(ratio - 1) < threshold:
+            continue
+        worse = ratio > 1
+        regressions += worse
+        print(f"{'SLOWER/LARGER' if worse else 'faster/smaller':15} {key:45} {old:>14} -> {new:<14} x{ratio:.2f}",
+              file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Model Manager scanner and renderer.")
+    parser.add_argument("--root", help="Benchmark an existing checkpoints folder instead of a synthetic tree")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--loras", type=int, default=10000)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", "-o", help="Write results JSON here instead of stdout")
+    parser.add_argument("--compare", help="Previous results JSON; exit 1 if a median or size regressed")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change reported by --compare")
+    args = parser.parse_args(argv)
+
+    plugin_class = load_plugin_class()
+    work_dir = tempfile.mkdtemp(prefix="mm-bench-")
+    try:
+        if args.root:
+            root = os.path.abspath(args.root)
+            tree = {"root": root}
+        else:
+            root = os.path.join(work_dir, "ckpts")
+            tree = generate_tree(root, args.files, args.loras, args.depth, args.fanout, args.seed)
+        data_dir = os.path.join(work_dir, "data")
+        os.makedirs(data_dir)
+
+        results = {"scan": bench_scans(plugin_class, root, data_dir, args.repeat)}
+        plugin = new_plugin(plugin_class, data_dir, root)
+        models = plugin.scan_models()
+        results["keystroke"] = bench_keystrokes(plugin_class, root, data_dir, args.repeat)
+        results["sort"] = bench_sorts(plugin_class, root, data_dir, args.repeat)
+        results["payload"] = bench_payloads(plugin, models)
+        results["memory"] = bench_memory(plugin_class, root)
+        report = {
+            "plugin_version": plugin.version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "tree": tree,
+            "results": results,
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        return 1 if compare(report, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
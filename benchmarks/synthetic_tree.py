@@ -0,0 +1,110 @@
+"""Synthetic checkpoints trees for the benchmarks.
+
+Files are sparse: a real safetensors header (so header classification is exercised) followed by
+a hole up to the target size, so a tree of multi-GB checkpoints takes almost no disk space.
+
+    python benchmarks/synthetic_tree.py /tmp/ckpts --files 2000 --loras 10000 --depth 3 --fanout 4
+"""
+import os
+import sys
+import json
+import time
+import random
+import struct
+import argparse
+import itertools
+
+
+GB = 1024 ** 3
+MB = 1024 ** 2
+
+# name prefix, extension, (min size, max size), tensor names written to the header
+MODEL_KINDS = [
+    ("wan2_1_t2v_14B", ".safetensors", (6 * GB, 28 * GB), ["blocks.0.self_attn.q.weight", "blocks.0.ffn.0.weight"]),
+    ("flux1_dev", ".safetensors", (2 * GB, 12 * GB), ["double_blocks.0.img_attn.qkv.weight"]),
+    ("umt5_xxl_enc", ".safetensors", (5 * GB, 11 * GB), ["encoder.block.0.layer.0.SelfAttention.q.weight", "shared.weight"]),
+    ("qwen2_5_vl_7B", ".safetensors", (4 * GB, 15 * GB), ["model.embed_tokens.weight", "lm_head.weight"]),
+    ("wan_vae", ".safetensors", (200 * MB, 500 * MB), ["decoder.conv_in.weight", "decoder.up_blocks.0.weight"]),
+    ("realesrgan_x4", ".safetensors", (30 * MB, 70 * MB), ["conv_first.weight", "RRDB_trunk.0.weight"]),
+    ("depth_anything", ".pth", (100 * MB, 1 * GB), None),
+    ("mmaudio_large", ".pth", (500 * MB, 4 * GB), None),
+    ("legacy_model", ".ckpt", (1 * GB, 7 * GB), None),
+]
+LORA_KIND = ("style_lora", ".safetensors", (10 * MB, 800 * MB), ["lora_unet_blocks_0.lora_down.weight",
+                                                                 "lora_unet_blocks_0.lora_up.weight"])
+DTYPES = ["BF16", "F16", "F8_E4M3"]
+
+
+def safetensors_header(keys, dtype, rng):
+    header = {"__metadata__": {"format": "pt"}}
+    offset = 0
+    for key in keys:
+        shape = [rng.choice((16, 64, 3072, 5120)), rng.choice((64, 3072, 5120))]
+        nbytes = shape[0] * shape[1] * 2
+        header[key] = {"dtype": dtype, "shape": shape, "data_offsets": [offset, offset + nbytes]}
+        offset += nbytes
+    data = json.dumps(header, separators=(",", ":")).encode()
+    return struct.pack("<Q", len(data)) + data
+
+
+def write_model(path, kind, rng, now):
+    _, ext, (min_size, max_size), keys = kind
+    size = rng.randint(min_size, max_size)
+    with open(path, "wb") as f:
+        if keys:
+            f.write(safetensors_header(keys, rng.choice(DTYPES), rng))
+        f.truncate(size)
+    mtime = now - rng.randint(0, 365 * 86400)
+    os.utime(path, (mtime, mtime))
+    return size
+
+
+def tree_dirs(base, depth, fanout):
+    """Leaf directories of a depth x fanout tree under base (base itself for depth 0)."""
+    return [os.path.join(base, *(f"d{level}_{k}" for level, k in enumerate(parts)))
+            for parts in itertools.product(range(fanout), repeat=depth)]
+
+
+def generate_tree(root, files=1000, loras=0, depth=2, fanout=4, seed=0):
+    """Create a synthetic checkpoints tree and return a summary dict.
+
+    files models of mixed kinds are spread over a depth x fanout tree under root, loras LoRAs over
+    the same shape of tree under root/loras.
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    start = time.perf_counter()
+    total = 0
+    all_dirs = set()
+    for count, base, kinds in ((files, root, MODEL_KINDS), (loras, os.path.join(root, "loras"), [LORA_KIND])):
+        if not count:
+            continue
+        dirs = tree_dirs(base, depth, fanout)
+        for d in dirs:
+            os.makedirs(d, exist_ok=True)
+        all_dirs.update(dirs)
+        for i in range(count):
+            kind = rng.choice(kinds)
+            path = os.path.join(dirs[i % len(dirs)], f"{kind[0]}_{i:06d}{kind[1]}")
+            total += write_model(path, kind, rng, now)
+    return {"root": root, "files": files + loras, "loras": loras, "dirs": len(all_dirs), "depth": depth,
+            "fanout": fanout, "seed": seed, "apparent_size": total, "seconds": round(time.perf_counter() - start, 3)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a sparse synthetic checkpoints tree.")
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=1000, help="Non-LoRA models")
+    parser.add_argument("--loras", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    summary = generate_tree(args.root, args.files, args.loras, args.depth, args.fanout, args.seed)
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
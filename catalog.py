@@ -0,0 +1,186 @@
+from array import array
+from .records import MODEL_TYPES
+
+
+class ModelCatalog:
+    """Read-only index over one scan result (a list of ModelRecords).
+
+    Sort orders, per-type buckets and a trigram index over names and relative paths are
+    built once (lazily, on first use) so filtering and sorting on every UI event only
+    intersects precomputed structures instead of re-scanning and re-sorting the list.
+    Per-model values (sort keys, rendered labels) are kept as columns indexed like models.
+
+    Sessions share a catalog without locking: every index is built in a local and stored with
+    a single assignment, so a concurrent reader sees either nothing or the complete index.
+    """
+
+    # name -> (key, descending, array typecode for numeric columns)
+    SORT_KEYS = {
+        "size": (lambda m: m.size, True, "q"),
+        "name": (lambda m: m.name.lower(), False, None),
+        "date": (lambda m: m.mtime, True, "d"),
+    }
+
+    def __init__(self, models):
+        self.models = models
+        self.count = len(models)
+        self.columns = {}
+        self.orders = {}
+        self.ranks = {}
+        self.type_buckets = None
+        self.search_text = None
+        self.trigrams = None
+        self.last_query = None
+        self.sizes = None
+        # Extra type-filter entries defined by a set of paths (e.g. "Duplicates")
+        self.path_filters = {}
+        self.path_buckets = {}
+
+    def copy(self):
+        """New catalog over the same models that shares every index built so far."""
+        other = ModelCatalog(self.models)
+        other.columns = dict(self.columns)
+        other.orders = dict(self.orders)
+        other.ranks = dict(self.ranks)
+        other.type_buckets = self.type_buckets
+        other.search_text = self.search_text
+        other.trigrams = self.trigrams
+        other.sizes = self.sizes
+        other.path_filters = dict(self.path_filters)
+        other.path_buckets = dict(self.path_buckets)
+        return other
+
+    def matches(self, models):
+        """True if this catalog was built for exactly this list."""
+        return self.models is models and self.count == len(models)
+
+    def get_order(self, sort_by):
+        """Indices of all models in sort_by order, and the rank of each index in that order."""
+        if sort_by not in self.SORT_KEYS:
+            sort_by = "size"
+        order = self.orders.get(sort_by)
+        if order is None:
+            key, reverse, typecode = self.SORT_KEYS[sort_by]
+            column = self.get_column(sort_by, key, typecode)
+            order = sorted(range(self.count), key=column.__getitem__, reverse=reverse)
+            rank = [0] * self.count
+            for pos, idx in enumerate(order):
+                rank[idx] = pos
+            # ranks first: a reader that finds the order also finds its ranks
+            self.ranks[sort_by] = rank
+            self.orders[sort_by] = order
+            return order, rank
+        return order, self.ranks[sort_by]
+
+    def get_column(self, name, key, typecode=None):
+        """[key(m) for m in models], computed once per catalog (an array when typecode is given)."""
+        column = self.columns.get(name)
+        if column is None:
+            values = (key(m) for m in self.models)
+            column = array(typecode, values) if typecode else list(values)
+            self.columns[name] = column
+        return column
+
+    def get_sizes(self):
+        """Map of path -> size in bytes."""
+        if self.sizes is None:
+            self.sizes = {m.path: m.size for m in self.models}
+        return self.sizes
+
+    def selected_size(self, selected_paths):
+        sizes = self.get_sizes()
+        return sum(sizes.get(p, 0) for p in selected_paths)
+
+    def get_type_bucket(self, model_type):
+        if self.type_buckets is None:
+            buckets = {}
+            for idx, m in enumerate(self.models):
+                buckets.setdefault(m.type_code, set()).add(idx)
+            type_buckets = {}
+            for code, bucket in buckets.items():
+                type_buckets.setdefault(MODEL_TYPES[code][0], set()).update(bucket)
+            self.type_buckets = type_buckets
+        return self.type_buckets.get(model_type, set())
+
+    def get_path_bucket(self, name):
+        bucket = self.path_buckets.get(name)
+        if bucket is None:
+            paths = self.path_filters[name]
+            bucket = {idx for idx, m in enumerate(self.models) if m.path in paths}
+            self.path_buckets[name] = bucket
+        return bucket
+
+    def set_path_filter(self, name, paths):
+        self.path_filters[name] = paths
+        self.path_buckets.pop(name, None)
+
+    def get_types(self):
+        if self.type_buckets is None:
+            self.get_type_bucket(None)
+        return sorted(self.type_buckets)
+
+    def build_search_index(self):
+        # search_text before trigrams: search() only checks the latter
+        self.search_text = [(m.name + "\n" + m.rel_path).lower() for m in self.models]
+        trigrams = {}
+        for idx, text in enumerate(self.search_text):
+            for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                posting = trigrams.get(gram)
+                if posting is None:
+                    trigrams[gram] = posting = set()
+                posting.add(idx)
+        self.trigrams = trigrams
+
+    def search(self, query):
+        """Set of indices whose name or relative path contains query (case-insensitive)."""
+        if self.trigrams is None:
+            self.build_search_index()
+        texts = self.search_text
+        # Read once: other sessions share the catalog and replace last_query concurrently
+        last = self.last_query
+        # Typing usually extends the previous query: refine its result instead of starting over
+        if last is not None and query.startswith(last[0]):
+            candidates = last[1]
+        elif len(query) < 3:
+            candidates = range(self.count)
+        else:
+            postings = []
+            for i in range(len(query) - 2):
+                posting = self.trigrams.get(query[i:i + 3])
+                if posting is None:
+                    return set()
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = set.intersection(*postings)
+        result = {idx for idx in candidates if query in texts[idx]}
+        self.last_query = (query, result)
+        return result
+
+    def subset(self, search_query="", type_filter="All"):
+        """Set of indices matching the filters, or None when nothing is filtered out."""
+        subset = None
+        query = (search_query or "").lower().strip()
+        if query:
+            subset = self.search(query)
+        if type_filter and type_filter != "All":
+            if type_filter in self.path_filters:
+                bucket = self.get_path_bucket(type_filter)
+            else:
+                bucket = self.get_type_bucket(type_filter)
+            subset = bucket if subset is None else subset & bucket
+        return subset
+
+    def select(self, sort_by="size", search_query="", type_filter="All"):
+        """Filtered indices in sort_by order."""
+        subset = self.subset(search_query, type_filter)
+        order, rank = self.get_order(sort_by)
+        if subset is None:
+            return order
+        # Small subsets: sort by precomputed rank; large ones: walk the presorted order
+        if len(subset) * 8 < self.count:
+            return sorted(subset, key=rank.__getitem__)
+        return [idx for idx in order if idx in subset]
+
+    def query(self, sort_by="size", search_query="", type_filter="All"):
+        models = self.models
+        return [models[idx] for idx in self.select(sort_by, search_query, type_filter)]
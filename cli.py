@@ -0,0 +1,210 @@
+import os
+import sys
+import csv
+import json
+import socket
+import argparse
+from .core import ModelManagerCore
+from .pruner import PrunePolicy
+from .inventory import DIFF_FIELDS, diff_inventories
+
+
+MODEL_FIELDS = ["path", "rel_path", "base_dir", "model_type", "size", "alloc", "modified", "params", "precision"]
+REPORT_FIELDS = ["group", "key", "size", "alloc", "files"]
+SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(text):
+    """Parse sizes like 500M, 2G or 1.5T (binary units) into bytes."""
+    text = text.strip().upper().rstrip("B") or "0"
+    unit = text[-1] if text[-1] in SIZE_UNITS else ""
+    number = text[:-1] if unit else text
+    try:
+        return int(float(number) * SIZE_UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {text}")
+
+
+def write_rows(rows, fields, args):
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            if isinstance(rows, list):
+                rows = [{f: r.get(f) for f in fields} for r in rows]
+            json.dump(rows, out, indent=2)
+            out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def select_models(core, args):
+    models = core.scan_models(force=getattr(args, "force", False))
+    selected = core.get_catalog(models).query(args.sort, args.search, args.type)
+    if args.larger_than:
+        selected = [m for m in selected if m.size >= args.larger_than]
+    return selected
+
+
+def cmd_scan(core, args):
+    write_rows([m.as_dict(MODEL_FIELDS) for m in select_models(core, args)], MODEL_FIELDS, args)
+    return 0
+
+
+def cmd_report(core, args):
+    core.scan_models(force=args.force)
+    snapshot = core.snapshot
+    apparent, alloc, files, linked = snapshot.disk_totals
+    groups = {kind: snapshot.top(kind, args.top) for kind in ("root", "type", "dir")}
+    if args.format == "csv":
+        rows = [{"group": "total", "key": "", "size": apparent, "alloc": alloc, "files": files}]
+        for kind, top in groups.items():
+            rows += [{"group": kind, "key": k, "size": s, "alloc": a, "files": n} for k, s, a, n in top]
+        write_rows(rows, REPORT_FIELDS, args)
+        return 0
+    report = {"total": {"size": apparent, "alloc": alloc, "files": files, "hardlinks": linked}}
+    for kind, top in groups.items():
+        report[kind] = [{"key": k, "size": s, "alloc": a, "files": n} for k, s, a, n in top]
+    write_rows(report, REPORT_FIELDS, args)
+    return 0
+
+
+def parse_root_budget(text):
+    root, sep, size = text.rpartition("=")
+    if not sep or not root:
+        raise argparse.ArgumentTypeError(f"expected ROOT=SIZE: {text}")
+    return root, parse_size(size)
+
+
+def cmd_prune(core, args):
+    policy = PrunePolicy(budget=args.budget, budgets=dict(args.root_budgets or []), unused_days=args.unused_days,
+                         protect_types=args.protect or [], min_size=args.min_size)
+    filtered = args.paths or args.search or args.larger_than or args.type != "All"
+    if not (filtered or policy.is_active()):
+        print("prune needs paths, a filter (--type, --search, --larger-than) or a policy "
+              "(--budget, --root-budget, --unused-days)", file=sys.stderr)
+        return 2
+    selected = select_models(core, args)
+    if args.paths:
+        wanted = {os.path.abspath(p) for p in args.paths}
+        selected = [m for m in selected if m.path in wanted]
+    if policy.is_active():
+        plan = policy.plan(core.models_cache, core.usage, {m.path for m in selected} if filtered else None)
+        action = "delete" if args.yes else "would delete"
+        rows = [dict(m, action=action) for m in plan["evict"]]
+        write_rows(rows, MODEL_FIELDS + ["last_used", "reason", "action"], args)
+        for base_dir, root in plan["roots"].items():
+            budget = "no budget" if root["budget"] is None else f"budget {core.format_size(root['budget'])}"
+            warn = "  still over budget (protected, small or recently used files)" if root["over_budget"] else ""
+            print(f"{base_dir}: {core.format_size(root['size'])} -> {core.format_size(root['size'] - root['freed'])} "
+                  f"({budget}), {root['files']} files{warn}", file=sys.stderr)
+        if args.yes and rows:
+            print(core.run_prune(plan), file=sys.stderr)
+        elif rows:
+            print("Dry run. Pass --yes to delete.", file=sys.stderr)
+        return 0
+    # No policy: --protect and --min-size still guard the filtered selection
+    selected = [m for m in selected if policy.is_candidate(m, None)]
+    action = "delete" if args.yes else "would delete"
+    write_rows([dict(m.as_dict(MODEL_FIELDS), action=action) for m in selected], MODEL_FIELDS + ["action"], args)
+    if args.yes and selected:
+        print(core.delete_models([m.path for m in selected]), file=sys.stderr)
+    elif selected:
+        print(f"Dry run: {len(selected)} files, {core.format_size(sum(m.size for m in selected))}. "
+              f"Pass --yes to delete.", file=sys.stderr)
+    return 0
+
+
+def cmd_export(core, args):
+    core.scan_models(force=args.force)
+    path = args.output or f"{args.node or socket.gethostname()}.models.jsonl.gz"
+    count = core.export_inventory(path, args.node, hashes=args.hash, with_meta=args.meta)
+    print(f"{count} models written to {path}", file=sys.stderr)
+    return 0
+
+
+def cmd_diff(core, args):
+    if len(args.inventories) < 2:
+        print("diff needs at least two inventories", file=sys.stderr)
+        return 2
+    counts = {}
+    try:
+        rows = count_statuses(diff_inventories(args.inventories), counts)
+        if args.format == "json":
+            rows = list(rows)
+        write_rows(rows, DIFF_FIELDS, args)
+    except (OSError, ValueError) as e:
+        print(f"diff failed: {e}", file=sys.stderr)
+        return 2
+    for node, statuses in counts.items():
+        summary = ", ".join(f"{n} {status}" for status, n in sorted(statuses.items()))
+        print(f"{node}: {summary}", file=sys.stderr)
+    return 1 if counts else 0
+
+
+def count_statuses(rows, counts):
+    for row in rows:
+        statuses = counts.setdefault(row["node"], {})
+        statuses[row["status"]] = statuses.get(row["status"], 0) + 1
+        yield row
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="model-manager", description="Scan, report on and prune Wan2GP model folders.")
+    parser.add_argument("--dir", dest="dirs", action="append", help="Model folder, repeatable (default: ckpts)")
+    parser.add_argument("--data-dir", help="Where scan_index.json / caches live (default: the plugin folder)")
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--output", "-o", help="Write to a file instead of stdout")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_filters(p):
+        p.add_argument("--type", default="All", help="Only this model type (e.g. LoRA)")
+        p.add_argument("--search", default="", help="Substring of name or relative path")
+        p.add_argument("--larger-than", type=parse_size, default=0, help="Minimum size, e.g. 500M or 2G")
+        p.add_argument("--sort", choices=["size", "name", "date"], default="size")
+        p.add_argument("--force", action="store_true", help="Full rescan, ignore the scan index")
+
+    p = sub.add_parser("scan", help="List models")
+    add_filters(p)
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("report", help="Disk usage by root, type and folder")
+    p.add_argument("--top", type=int, default=10)
+    p.add_argument("--force", action="store_true", help="Full rescan, ignore the scan index")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("prune", help="Delete models matching the filters (dry run unless --yes)")
+    add_filters(p)
+    p.add_argument("paths", nargs="*", help="Restrict to these files")
+    p.add_argument("--budget", type=parse_size, help="Evict least recently used files until every root fits, e.g. 400G")
+    p.add_argument("--root-budget", dest="root_budgets", type=parse_root_budget, action="append",
+                   help="Budget for one root, ROOT=SIZE, repeatable (overrides --budget)")
+    p.add_argument("--unused-days", type=int, help="Never evict files used in the last N days; "
+                                                   "without a budget, evict everything idle longer")
+    p.add_argument("--protect", action="append", help="Model type that is never evicted, repeatable")
+    p.add_argument("--min-size", type=parse_size, default=0,
+                   help="Never evict files smaller than this, e.g. 100M (they still count against the budget)")
+    p.add_argument("--yes", action="store_true", help="Actually delete")
+    p.set_defaults(func=cmd_prune)
+
+    p = sub.add_parser("export", help="Write a gzip JSON-lines inventory of the models (default: NODE.models.jsonl.gz)")
+    p.add_argument("--node", help="Node name stored in the inventory (default: the host name)")
+    p.add_argument("--meta", action="store_true", help="Include header kind, parameter count and precision")
+    p.add_argument("--hash", action="store_true", help="Include a full blake2b hash of every file (slow the first time)")
+    p.add_argument("--force", action="store_true", help="Full rescan, ignore the scan index")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("diff", help="Compare inventories with the first one; exits with 1 when they differ")
+    p.add_argument("inventories", nargs="+", help="Inventory files written by export, the reference first")
+    p.set_defaults(func=cmd_diff)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    core = ModelManagerCore(data_dir=args.data_dir, model_dirs=args.dirs or ["ckpts"])
+    return args.func(core, args)
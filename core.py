@@ -0,0 +1,510 @@
+import os
+import time
+import threading
+from collections import deque
+from .scan_index import ScanIndex
+from .scanner import ModelScanner
+from .catalog import ModelCatalog
+from .usage import UsageRecorder
+from .model_header import inspect_model
+from .delete_queue import DeleteQueue
+from .analytics import DiskUsage
+from .records import ModelRecord, MODEL_TYPES, format_size
+from .instrumentation import Instrumentation
+from .snapshot import CatalogSnapshot, ScanJob
+from .type_rules import TypeRules
+
+DUPLICATES_FILTER = "🔁 Duplicates"
+
+
+class ModelManagerCore:
+    """Scanning, classification, filtering and deletion without any Gradio dependency.
+    
+    Used as the base of the Wan2GP plugin and directly by the command line interface, so
+    imports only needed by the UI (watcher, hashing, file explorer) are deferred.
+    
+    All sessions share one catalog. Scan results are published as immutable, versioned
+    CatalogSnapshots that readers use without locking; every publish happens under cache_lock.
+    Scans and watcher updates also serialize on scan_run_lock, so a scan never publishes over
+    folders the watcher re-listed while it ran. Concurrent refreshes join the scan already in
+    flight instead of starting their own.
+    """
+    
+    # Methods timed while instrumentation is enabled
+    INSTRUMENTED_METHODS = ("iter_scan_models", "scan_models", "apply_dir_changes", "reload_type_rules",
+                            "filter_models", "get_unique_types", "find_duplicates", "queue_delete")
+    
+    def __init__(self, data_dir=None, model_dirs=None):
+        self.plugin_dir = os.path.dirname(os.path.abspath(__file__))
+        self.data_dir = data_dir or self.plugin_dir
+        self.model_dirs = model_dirs
+        self.default_model_dirs = ["ckpts"]
+        self.model_extensions = [".safetensors", ".sft", ".pth", ".pt", ".ckpt"]
+        self.usage_file = os.path.join(self.data_dir, "model_usage.json")
+        self.usage = UsageRecorder(self.usage_file, self.model_extensions)
+        self.duplicates = None
+        self.duplicate_paths = set()
+        self.duplicate_groups = []
+        self.delete_queue = DeleteQueue()
+        self.disk_usage = DiskUsage()
+        self.scan_index = ScanIndex(os.path.join(self.data_dir, "scan_index.json"))
+        self.scanner = ModelScanner(self.scan_index, self.model_extensions, inspect=inspect_model)
+        # User type rules (model_types.json) go before the built-in ones
+        self.type_rules = TypeRules(os.path.join(self.data_dir, "model_types.json"))
+        
+        # Keep the catalog live from filesystem events ("auto", "inotify", "poll" or None to disable)
+        self.watch_backend = None
+        self.watcher = None
+        self.cache_lock = threading.RLock()
+        
+        self.snapshot = CatalogSnapshot(0, [], ModelCatalog([]))
+        # The previous snapshot too: handlers that started before a swap still get its catalog
+        self.recent_snapshots = deque([self.snapshot], maxlen=2)
+        self.scan_job = None
+        self.scan_job_lock = threading.Lock()
+        self.scan_run_lock = threading.Lock()
+        # Folders visited by the last scan, for the watcher (started once scan_run_lock is released)
+        self.scanned_dirs = set()
+        # Paths staged for deletion while a scan runs: its listings may predate the staging
+        self.deleted_during_scan = set()
+        self.instrumentation = Instrumentation()
+
+    @property
+    def models_cache(self):
+        """Models of the current snapshot (read-only)."""
+        return self.snapshot.models
+
+    @property
+    def catalog(self):
+        return self.snapshot.catalog
+
+    def publish(self, models, catalog=None):
+        """Swap in a new snapshot of models. Caller holds cache_lock and has updated disk_usage."""
+        totals, rankings = self.disk_usage.freeze()
+        snapshot = CatalogSnapshot(self.snapshot.version + 1, models, catalog or self.new_catalog(models),
+                                   totals, rankings)
+        self.snapshot = snapshot
+        self.recent_snapshots.append(snapshot)
+        return snapshot
+
+    def request_scan(self, force=False):
+        """Start a background scan, or return the one already running (single flight).
+        
+        A forced request does not join an incremental scan: it queues a forced one behind it.
+        """
+        with self.scan_job_lock:
+            job = self.scan_job
+            if job is not None and not job.done and (job.force or not force):
+                return job
+            job = ScanJob(force)
+            self.scan_job = job
+        threading.Thread(target=self.run_scan_job, args=(job,), name="mm-scan-job", daemon=True).start()
+        return job
+
+    def run_scan_job(self, job):
+        with self.scan_run_lock:
+            try:
+                for batch in self.iter_scan_models(force=job.force):
+                    job.add_batch(batch)
+            except Exception as e:
+                job.finish(error=e)
+                return
+        # Finish before touching the watcher, outside the lock: the watcher thread may be waiting
+        # for both in apply_dir_changes
+        job.finish(self.snapshot)
+        self.start_watcher(self.scanned_dirs)
+
+    def set_instrumentation(self, enabled):
+        if enabled:
+            targets = [(self, name, name) for name in self.INSTRUMENTED_METHODS]
+            targets.append((self.scanner, "list_dir", "scanner.list_dir"))
+            targets.append((self.type_rules, "classify", "type_rules.classify"))
+            self.instrumentation.enable(targets)
+        else:
+            self.instrumentation.disable()
+
+    def get_model_dirs(self):
+        if self.model_dirs is not None:
+            return [d for d in self.model_dirs if os.path.isdir(d)]
+        try:
+            if hasattr(self, 'server_config') and self.server_config:
+                paths = self.server_config.get("checkpoints_paths", self.default_model_dirs)
+                return [p for p in paths if os.path.isdir(p)]
+        except:
+            pass
+        return [d for d in self.default_model_dirs if os.path.isdir(d)]
+
+    def format_size(self, size_bytes):
+        return format_size(size_bytes)
+
+    def detect_model_type(self, filename, path, size_bytes, meta=None):
+        """(type, color, icon) of a model, preferring its safetensors header over filename rules."""
+        dir_path, name = os.path.split(path)
+        return MODEL_TYPES[self.type_rules.classify(name, dir_path, size_bytes, meta)]
+
+    def reload_type_rules(self):
+        """Re-read the type rules file if it changed and re-classify the catalog without a scan.
+        
+        Returns True when a new snapshot was published.
+        """
+        # Cheap check first: the locks wait for any scan in flight
+        if self.type_rules.stamp() == self.type_rules.file_stamp:
+            return False
+        with self.scan_run_lock, self.cache_lock:
+            if not self.type_rules.reload_if_changed():
+                return False
+            old = self.models_cache
+            models = [m.retyped(self.type_rules.classify(m.name, m.dir, m.size, m.meta)) for m in old]
+            self.disk_usage.sync(old, models)
+            self.publish(models)
+        return True
+
+    def open_folder(self, model_path):
+        if not model_path or not os.path.exists(model_path):
+            return "❌ File not found"
+        import subprocess
+        import platform
+        folder = os.path.dirname(model_path)
+        try:
+            if platform.system() == "Windows":
+                subprocess.Popen(f'explorer /select,"{model_path}"')
+            else:
+                subprocess.Popen(["xdg-open", folder])
+            return f"✅ Opened: {folder}"
+        except Exception as e:
+            return f"❌ Error: {e}"
+
+    def build_model_entry(self, filename, dir_path, base_dir, abs_base_dir, info):
+        """ModelRecord from a scan index file entry [size, mtime_ns, inode, meta, allocated, device, links]."""
+        size, mtime_ns, ino, meta, alloc, dev, nlink = info
+        code = self.type_rules.classify(filename, dir_path, size, meta)
+        return ModelRecord(filename, dir_path, base_dir, abs_base_dir, size, mtime_ns / 1e9, code, meta, alloc, dev, ino,
+                           nlink)
+
+    def same_entry(self, m, base_dir, info):
+        """True if ModelRecord m still describes the scan index file entry info under base_dir."""
+        size, mtime_ns, ino, meta, alloc, dev, nlink = info
+        return (m.size == size and m.mtime == mtime_ns / 1e9 and m.ino == ino and m.alloc == alloc
+                and m.dev == dev and m.nlink == nlink and m.meta == meta and m.base_dir == base_dir)
+
+    def iter_scan_models(self, scan_dirs=None, force=False, batch_size=200, batch_interval=0.25):
+        """Scan model folders, yielding batches of ModelRecords as they are found.
+        
+        Unchanged directories are served from the scan index unless force is set.
+        When the generator is exhausted the full, size-sorted list is published as a new snapshot.
+        Use request_scan() / scan_models() rather than calling this directly, so scans do not overlap
+        with each other or with watcher updates; they start the watcher afterwards.
+        """
+        if scan_dirs is None:
+            scan_dirs = self.get_model_dirs()
+        
+        bases = [d for d in scan_dirs if os.path.isdir(d)]
+        roots = [os.path.abspath(d) for d in bases]
+        with self.cache_lock:
+            self.type_rules.reload_if_changed()
+            self.deleted_during_scan = set()
+        
+        found = {}
+        visited_dirs = set()
+        batch = []
+        last_yield = time.monotonic()
+        for root_idx, dir_path, files in self.scanner.iter_listings(roots, force):
+            visited_dirs.add(dir_path)
+            for filename, info in files.items():
+                full_path = os.path.join(dir_path, filename)
+                prev = found.get(full_path)
+                # Overlapping roots: keep the entry of the first configured root
+                if prev is not None and prev[0] <= root_idx:
+                    continue
+                entry = self.build_model_entry(filename, dir_path, bases[root_idx], roots[root_idx], info)
+                found[full_path] = (root_idx, entry)
+                if prev is None:
+                    batch.append(entry)
+            if batch and (len(batch) >= batch_size or time.monotonic() - last_yield >= batch_interval):
+                yield batch
+                batch = []
+                last_yield = time.monotonic()
+        if batch:
+            yield batch
+        
+        models = [entry for _, entry in found.values()]
+        models.sort(key=lambda x: x.size, reverse=True)
+        with self.cache_lock:
+            # queue_delete does not wait for the scan (that would block the instant delete)
+            if self.deleted_during_scan:
+                models = [m for m in models if m.path not in self.deleted_during_scan]
+            self.scan_index.prune(visited_dirs, roots)
+            self.scan_index.save()
+            self.type_rules.retain(visited_dirs)
+            self.disk_usage.sync(self.models_cache, models)
+            self.publish(models)
+        self.scanned_dirs = visited_dirs
+
+    def scan_models(self, scan_dirs=None, force=False):
+        """Scan and return the models, joining a scan that is already running."""
+        if scan_dirs is not None:
+            with self.scan_run_lock:
+                for _ in self.iter_scan_models(scan_dirs, force):
+                    pass
+            self.start_watcher(self.scanned_dirs)
+            return self.models_cache
+        return self.request_scan(force).wait().models
+
+    def find_root(self, dir_path, roots):
+        """Return (base_dir, abs_base_dir) of the first configured root containing dir_path."""
+        for base_dir, abs_base_dir in roots:
+            if dir_path == abs_base_dir or dir_path.startswith(os.path.join(abs_base_dir, "")):
+                return base_dir, abs_base_dir
+        return None
+
+    def apply_dir_changes(self, dir_paths):
+        """Re-list changed directories and patch the catalog and the scan index without a full walk.
+        
+        Returns (new_dirs, recheck_dirs) for the watcher. dir_paths=None means a full incremental rescan.
+        Runs under scan_run_lock: waits for a scan in progress, which would otherwise publish its
+        listings of these folders over the update.
+        """
+        if dir_paths is None:
+            self.scan_models()
+            return list(self.scan_index.dirs), []
+        with self.scan_run_lock:
+            return self.relist_dirs(dir_paths)
+    
+    def relist_dirs(self, dir_paths):
+        """apply_dir_changes() body; caller holds scan_run_lock."""
+        roots = [(d, os.path.abspath(d)) for d in self.get_model_dirs()]
+        changed = {}
+        new_dirs = []
+        recheck_dirs = []
+        settle_ns = int(self.watcher.debounce * 1e9) if self.watcher else 0
+        now_ns = time.time_ns()
+        
+        with self.cache_lock:
+            stack = [d for d in dir_paths if self.find_root(d, roots)]
+            while stack:
+                dir_path = stack.pop()
+                if dir_path in changed:
+                    continue
+                old = self.scan_index.dirs.get(dir_path)
+                old_subdirs = set(old["dirs"]) if old else set()
+                try:
+                    subdirs, files = self.scanner.list_dir(dir_path, force=True)
+                except OSError:
+                    subdirs, files = [], None
+                changed[dir_path] = files
+                for d in subdirs:
+                    if d not in old_subdirs:
+                        sub_path = os.path.join(dir_path, d)
+                        stack.append(sub_path)
+                        new_dirs.append(sub_path)
+                # Subtrees that vanished (deleted, moved away or hidden)
+                gone = [os.path.join(dir_path, d) for d in old_subdirs.difference(subdirs)]
+                if files is None:
+                    gone.append(dir_path)
+                if gone:
+                    prefixes = tuple(os.path.join(g, "") for g in gone)
+                    for d in [d for d in self.scan_index.dirs if d in gone or d.startswith(prefixes)]:
+                        changed[d] = None
+                        del self.scan_index.dirs[d]
+                        self.scan_index.dirty = True
+                # Files modified within the debounce window may still be downloading
+                if files and any(now_ns - f[1] < settle_ns for f in files.values()):
+                    recheck_dirs.append(dir_path)
+            
+            models = []
+            removed = {}
+            for m in self.models_cache:
+                if m.dir in changed:
+                    removed[(m.dir, m.name)] = m
+                else:
+                    models.append(m)
+            added = []
+            for dir_path, files in changed.items():
+                root = self.find_root(dir_path, roots) if files else None
+                if root is None:
+                    continue
+                for filename, info in files.items():
+                    prev = removed.get((dir_path, filename))
+                    if prev is not None and self.same_entry(prev, root[0], info):
+                        del removed[(dir_path, filename)]
+                        models.append(prev)
+                    else:
+                        added.append(self.build_model_entry(filename, dir_path, root[0], root[1], info))
+            self.scan_index.save()
+            # Attribute changes and settle rechecks usually change nothing: keep the snapshot, its
+            # lazily built indexes and the version sessions have sent their size tables for
+            if not removed and not added:
+                return new_dirs, recheck_dirs
+            for m in removed.values():
+                self.disk_usage.remove(m)
+            for entry in added:
+                self.disk_usage.add(entry)
+                models.append(entry)
+            models.sort(key=lambda x: x.size, reverse=True)
+            self.publish(models)
+        return new_dirs, recheck_dirs
+
+    def start_watcher(self, dir_paths):
+        if not self.watch_backend:
+            return
+        try:
+            if self.watcher is None:
+                from .watcher import ModelWatcher
+                # Late-bound, so wrappers installed on apply_dir_changes later (instrumentation) still apply
+                self.watcher = ModelWatcher(lambda dirs: self.apply_dir_changes(dirs), backend=self.watch_backend)
+            self.watcher.start(dir_paths)
+        except OSError as e:
+            print(f"[Model Manager] File watcher disabled: {e}")
+            self.watch_backend = None
+            self.watcher = None
+
+    def new_catalog(self, models):
+        catalog = ModelCatalog(models)
+        if self.duplicate_paths:
+            catalog.set_path_filter(DUPLICATES_FILTER, self.duplicate_paths)
+        return catalog
+
+    def get_duplicate_finder(self):
+        if self.duplicates is None:
+            from .duplicates import DuplicateFinder
+            self.duplicates = DuplicateFinder(os.path.join(self.data_dir, "hash_cache.json"))
+        return self.duplicates
+
+    def export_inventory(self, path, node=None, hashes=False, with_meta=False):
+        """Write the current snapshot to a gzip JSON-lines inventory for comparison across nodes.
+        
+        hashes adds a full-file blake2b per model (cached in hash_cache.json, like duplicate checks).
+        """
+        import socket
+        from .inventory import write_inventory
+        hasher = self.get_duplicate_finder() if hashes else None
+        return write_inventory(path, self.snapshot.models, node or socket.gethostname(), hasher, with_meta)
+
+    def find_duplicates(self, models):
+        """Hash-compare same-size models and expose the result as the Duplicates filter."""
+        groups = self.get_duplicate_finder().find(models)
+        with self.cache_lock:
+            self.duplicate_groups = [[m.path for m in g] for g in groups]
+            self.duplicate_paths = {m.path for g in groups for m in g}
+            # Same models, so the new snapshot's catalog keeps every index already built
+            catalog = self.snapshot.catalog.copy()
+            catalog.set_path_filter(DUPLICATES_FILTER, self.duplicate_paths)
+            self.publish(self.snapshot.models, catalog)
+        if not groups:
+            return "✅ No duplicate models found"
+        reclaimable = sum(g[0].size * (len(g) - 1) for g in groups)
+        msg = f"🔁 {len(groups)} duplicate groups, {self.format_size(reclaimable)} reclaimable\n"
+        lines = [" = ".join(m.rel_path for m in g) for g in groups[:5]]
+        msg += "• " + "\n• ".join(lines)
+        if len(groups) > 5:
+            msg += f"\n... and {len(groups)-5} more"
+        return msg
+
+    def forget_duplicates(self, removed):
+        """Drop deleted paths from the Duplicates filter, and groups left with a single copy.
+        Caller holds cache_lock and publishes a new snapshot afterwards."""
+        if not self.duplicate_paths or not removed:
+            return
+        groups = [[p for p in g if p not in removed] for g in self.duplicate_groups]
+        self.duplicate_groups = [g for g in groups if len(g) > 1]
+        self.duplicate_paths = {p for g in self.duplicate_groups for p in g}
+
+    def get_catalog(self, models):
+        """Return the catalog indexing models: the snapshot's own, or a private one for other lists."""
+        for snapshot in reversed(self.recent_snapshots):
+            if snapshot.catalog.matches(models):
+                return snapshot.catalog
+        return self.new_catalog(models)
+
+    def filter_models(self, models, search_query="", type_filter="All"):
+        subset = self.get_catalog(models).subset(search_query, type_filter)
+        if subset is None:
+            return models
+        return [models[idx] for idx in sorted(subset)]
+
+    def get_unique_types(self, models):
+        types = ["All"] + self.get_catalog(models).get_types()
+        if self.duplicate_paths:
+            types.append(DUPLICATES_FILTER)
+        return types
+
+    def delete_models(self, selected_paths):
+        if not selected_paths:
+            return "❌ No models selected for deletion"
+        
+        deleted = []
+        errors = []
+        freed = 0
+        
+        for path in selected_paths:
+            try:
+                if os.path.exists(path):
+                    size = os.path.getsize(path)
+                    os.remove(path)
+                    deleted.append(os.path.basename(path))
+                    freed += size
+            except Exception as e:
+                errors.append(f"{os.path.basename(path)}: {e}")
+        
+        return self.format_delete_result(deleted, errors, freed)
+
+    def format_delete_result(self, deleted, errors, freed):
+        msg = ""
+        if deleted:
+            msg = f"✅ Deleted {len(deleted)} files ({self.format_size(freed)} freed)\n"
+            msg += "• " + "\n• ".join(deleted[:5])
+            if len(deleted) > 5:
+                msg += f"\n... and {len(deleted)-5} more"
+        if errors:
+            msg += f"\n\n⚠️ Errors:\n• " + "\n• ".join(errors[:3])
+        
+        return msg if msg else "❌ Nothing deleted"
+
+    def run_prune(self, plan):
+        """Delete every file of a plan that is still the one that was planned, then patch the cache."""
+        paths = []
+        errors = []
+        for m in plan["evict"]:
+            try:
+                if os.path.getsize(m["path"]) == m["size"]:
+                    paths.append(m["path"])
+                else:
+                    errors.append(f"{m['name']}: changed since the plan was made")
+            except OSError as e:
+                errors.append(f"{m['name']}: {e}")
+        msg = self.delete_models(paths) if paths else "❌ Nothing deleted"
+        if paths:
+            with self.cache_lock:
+                self.forget_duplicates({p for p in paths if not os.path.exists(p)})
+            self.apply_dir_changes(sorted({os.path.dirname(p) for p in paths}))
+        if errors:
+            msg += "\n\n⚠️ Skipped:\n• " + "\n• ".join(errors[:3])
+        return msg
+
+    def queue_delete(self, selected_paths):
+        """Stage files for background deletion and drop them from the cache. Returns (batch_id, jobs)."""
+        roots = [os.path.abspath(d) for d in self.get_model_dirs()]
+        batch_id, jobs = self.delete_queue.submit(selected_paths, roots)
+        removed = {job["path"] for job in jobs if job["status"] != "error"}
+        with self.cache_lock:
+            if self.scan_run_lock.locked():
+                self.deleted_during_scan.update(removed)
+            self.forget_duplicates(removed)
+            models = []
+            for m in self.models_cache:
+                if m.path in removed:
+                    self.disk_usage.remove(m)
+                else:
+                    models.append(m)
+            self.publish(models)
+        return batch_id, jobs
+
+    def undo_delete(self, batch_ids=None):
+        """Restore files of the given delete batches (default: all) still in the trash and re-list their folders."""
+        if batch_ids is None:
+            restored = self.delete_queue.undo()
+        else:
+            restored = [job for batch_id in batch_ids for job in self.delete_queue.undo(batch_id)]
+        if restored:
+            self.apply_dir_changes(sorted({os.path.dirname(job["path"]) for job in restored}))
+        return restored
@@ -0,0 +1,165 @@
+import os
+import time
+import uuid
+import errno
+import itertools
+import threading
+
+
+TRASH_DIR_NAME = ".mm_trash"
+
+
+class DeleteQueue:
+    """Two-phase background deletion.
+
+    submit() renames files into a hidden trash folder on the same filesystem, which is instant
+    and lets the UI drop them right away. A worker thread unlinks staged files once the grace
+    period has passed; until then undo() moves them back. Files that cannot be staged (other
+    filesystem, permissions, read-only model root) are unlinked directly by the worker.
+
+    Staged files are named "<pid>-<token>-<batch>-<staged at>_<n>_<name>": the owner (process id
+    plus a random start token) and the staging time let another process tell an abandoned file
+    from one still inside its owner's grace period.
+    """
+
+    def __init__(self, grace_period=15.0):
+        self.grace_period = grace_period
+        self.jobs = []
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.batch_numbers = itertools.count(1)
+        self.cond = threading.Condition()
+        self.thread = None
+        self.known_trash_dirs = set()
+
+    def trash_dir_for(self, path, roots):
+        """Trash folder at the top of the model root holding path (hidden, so scans skip it)."""
+        dir_path = os.path.dirname(path)
+        for root in roots:
+            if dir_path == root or dir_path.startswith(os.path.join(root, "")):
+                return os.path.join(root, TRASH_DIR_NAME)
+        return os.path.join(dir_path, TRASH_DIR_NAME)
+
+    def staged_by(self, path, name):
+        """(owner, wall-clock staging time) of a trash file; names from older versions have no owner."""
+        parts = name.split("_", 1)[0].split("-")
+        if len(parts) == 4 and parts[3].isdigit():
+            return f"{parts[0]}-{parts[1]}", int(parts[3])
+        st = os.stat(path)
+        return None, max(st.st_mtime, st.st_ctime)
+
+    def collect_leftovers(self, trash_dir, jobs):
+        """Files of other processes in a trash folder this session has not used yet: delete them once
+        their grace period is over (their owner may still undo them until then, or was interrupted)."""
+        if trash_dir in self.known_trash_dirs:
+            return
+        self.known_trash_dirs.add(trash_dir)
+        try:
+            names = os.listdir(trash_dir)
+        except OSError:
+            return
+        now = time.time()
+        now_mono = time.monotonic()
+        for name in names:
+            path = os.path.join(trash_dir, name)
+            try:
+                owner, staged_at = self.staged_by(path, name)
+            except OSError:
+                continue
+            if owner == self.owner:
+                continue
+            due = now_mono + max(0.0, staged_at + self.grace_period - now)
+            jobs.append({"batch": None, "path": path, "name": name, "trash": None, "size": 0,
+                         "due": due, "status": "staged", "error": None})
+
+    def submit(self, paths, roots=()):
+        """Stage paths for deletion and return (batch_id, jobs)."""
+        batch_id = f"{self.owner}-{next(self.batch_numbers)}"
+        staged_at = int(time.time())
+        due = time.monotonic() + self.grace_period
+        jobs = []
+        leftovers = []
+        for i, path in enumerate(paths):
+            job = {"batch": batch_id, "path": path, "name": os.path.basename(path), "trash": None,
+                   "size": 0, "due": due, "status": "staged", "error": None}
+            try:
+                job["size"] = os.path.getsize(path)
+                trash_dir = self.trash_dir_for(path, roots)
+                self.collect_leftovers(trash_dir, leftovers)
+                trash_path = os.path.join(trash_dir, f"{batch_id}-{staged_at}_{i}_{job['name']}")
+                try:
+                    # A read-only model root cannot hold the trash folder: same fallback as a failed rename
+                    os.makedirs(trash_dir, exist_ok=True)
+                    if os.path.lexists(trash_path):
+                        # rename() would silently replace it
+                        raise FileExistsError(errno.EEXIST, "already in the trash", trash_path)
+                    os.rename(path, trash_path)
+                    job["trash"] = trash_path
+                except OSError as e:
+                    if e.errno not in (errno.EXDEV, errno.EACCES, errno.EPERM, errno.EROFS):
+                        raise
+                    # Cannot stage: the worker removes the original right away, no undo
+                    job["due"] = 0
+            except OSError as e:
+                job["status"] = "error"
+                job["error"] = str(e)
+            jobs.append(job)
+        with self.cond:
+            self.jobs.extend(jobs)
+            self.jobs.extend(leftovers)
+            self.cond.notify()
+        self.start()
+        return batch_id, jobs
+
+    def undo(self, batch_id=None):
+        """Move staged files of a batch (default: all batches) back. Returns the restored jobs."""
+        restored = []
+        with self.cond:
+            for job in self.jobs:
+                if job["status"] != "staged" or job["trash"] is None:
+                    continue
+                if batch_id is not None and job["batch"] != batch_id:
+                    continue
+                try:
+                    if os.path.lexists(job["path"]):
+                        raise FileExistsError(errno.EEXIST, "a new file has the same name", job["path"])
+                    os.rename(job["trash"], job["path"])
+                    job["status"] = "restored"
+                    restored.append(job)
+                except OSError as e:
+                    job["error"] = str(e)
+        return restored
+
+    def batch_jobs(self, batch_id):
+        with self.cond:
+            return [dict(job) for job in self.jobs if job["batch"] == batch_id]
+
+    def start(self):
+        with self.cond:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self.run, name="mm-delete", daemon=True)
+            self.thread.start()
+
+    def run(self):
+        while True:
+            with self.cond:
+                now = time.monotonic()
+                job = next((j for j in self.jobs if j["status"] == "staged" and j["due"] <= now), None)
+                if job is None:
+                    staged = [j["due"] for j in self.jobs if j["status"] == "staged"]
+                    self.cond.wait(max(0.05, min(staged) - now) if staged else None)
+                    continue
+                job["status"] = "deleting"
+            try:
+                os.remove(job["trash"] or job["path"])
+                status, error = "deleted", None
+            except OSError as e:
+                status, error = "error", str(e)
+            with self.cond:
+                job["status"] = status
+                job["error"] = error
+                # Keep finished jobs around only for the most recent batches
+                done = [j for j in self.jobs if j["status"] in ("deleted", "restored", "error")]
+                if len(done) > 1000:
+                    drop = {id(j) for j in done[:len(done) - 1000]}
+                    self.jobs = [j for j in self.jobs if id(j) not in drop]
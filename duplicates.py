@@ -0,0 +1,129 @@
+import os
+import json
+import mmap
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+PARTIAL_CHUNK = 4 * 1024 * 1024
+READ_BLOCK = 64 * 1024 * 1024
+
+
+def hash_file(path, size, partial=False, chunk=PARTIAL_CHUNK):
+    """blake2b of a file read through mmap. partial hashes only the first and last chunk."""
+    h = hashlib.blake2b(digest_size=20)
+    if size == 0:
+        return h.hexdigest()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, "madvise") and not partial:
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        view = memoryview(mm)
+        try:
+            if partial:
+                h.update(view[:chunk])
+                h.update(view[max(chunk, size - chunk):])
+            else:
+                for offset in range(0, size, READ_BLOCK):
+                    h.update(view[offset:offset + READ_BLOCK])
+        finally:
+            view.release()
+    return h.hexdigest()
+
+
+class DuplicateFinder:
+    """Finds byte-identical model files.
+
+    Files are bucketed by exact size, then compared by a hash of their first/last chunk, and
+    only files that still collide are hashed in full. Hashes are cached by (device, inode,
+    size, mtime) in hash_cache.json so unchanged files are never read twice.
+    """
+
+    def __init__(self, cache_file, max_workers=4):
+        self.cache_file = cache_file
+        self.max_workers = max_workers
+        self.cache = {}
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                self.cache = json.load(f)
+        except (OSError, ValueError):
+            self.cache = {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_file = self.cache_file + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.cache, f, separators=(",", ":"))
+            os.replace(tmp_file, self.cache_file)
+            self.dirty = False
+        except OSError:
+            pass
+
+    def cache_key(self, path):
+        stat = os.stat(path)
+        return f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def get_hash(self, path, size, partial):
+        field = "partial" if partial else "full"
+        key = self.cache_key(path)
+        entry = self.cache.get(key)
+        if entry and field in entry:
+            return entry[field]
+        # A file no larger than both partial chunks is fully covered by the partial hash
+        if not partial and size <= 2 * PARTIAL_CHUNK:
+            return self.get_hash(path, size, True)
+        digest = hash_file(path, size, partial)
+        with self.lock:
+            self.cache.setdefault(key, {})[field] = digest
+            self.dirty = True
+        return digest
+
+    def group_by_hash(self, pool, paths, size, partial):
+        futures = {pool.submit(self.get_hash, p, size, partial): p for p in paths}
+        groups = {}
+        for fut, path in futures.items():
+            try:
+                groups.setdefault(fut.result(), []).append(path)
+            except OSError:
+                continue
+        return [g for g in groups.values() if len(g) > 1]
+
+    def find(self, models):
+        """Return groups of duplicate models, largest reclaimable space first."""
+        by_size = {}
+        for m in models:
+            if m.size > 0:
+                by_size.setdefault(m.size, []).append(m)
+        by_path = {m.path: m for m in models}
+
+        groups = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mm-hash") as pool:
+            for size, bucket in by_size.items():
+                if len(bucket) < 2:
+                    continue
+                # Hardlinks share their data, deleting one of them frees nothing
+                paths = []
+                inodes = set()
+                for m in bucket:
+                    try:
+                        stat = os.stat(m.path)
+                    except OSError:
+                        continue
+                    if (stat.st_dev, stat.st_ino) not in inodes:
+                        inodes.add((stat.st_dev, stat.st_ino))
+                        paths.append(m.path)
+                if len(paths) < 2:
+                    continue
+                for candidates in self.group_by_hash(pool, paths, size, True):
+                    for group in self.group_by_hash(pool, candidates, size, False):
+                        groups.append([by_path[p] for p in group])
+        self.save()
+        groups.sort(key=lambda g: g[0].size * (len(g) - 1), reverse=True)
+        return groups
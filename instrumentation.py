@@ -0,0 +1,166 @@
+import json
+import time
+import inspect
+import threading
+import functools
+from collections import deque
+
+
+def payload_size(value):
+    """UTF-8 size of the strings in a handler result (HTML, labels, gr.update values)."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, dict):
+        return sum(payload_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(v) for v in value)
+    return 0
+
+
+class Instrumentation:
+    """Call counts, durations and payload sizes of the hot paths, off by default.
+
+    Methods are only wrapped while recording is enabled (enable() patches them on their
+    instance, disable() removes the patches), so a disabled recorder costs nothing on the hot
+    paths. Event handlers, which are handed to Gradio once, are wrapped permanently with a
+    single flag check. The last capacity calls are kept in a ring buffer; per-name totals are
+    kept for the whole session and exported as JSON or Prometheus text.
+    """
+
+    def __init__(self, capacity=2000):
+        self.enabled = False
+        self.events = deque(maxlen=capacity)
+        self.totals = {}
+        self.lock = threading.Lock()
+        self.patched = []
+
+    def record(self, name, duration, payload=0, error=False):
+        self.events.append((time.time(), name, duration, payload, error))
+        with self.lock:
+            totals = self.totals.get(name)
+            if totals is None:
+                # [calls, seconds, max seconds, payload bytes, errors]
+                totals = self.totals[name] = [0, 0.0, 0.0, 0, 0]
+            totals[0] += 1
+            totals[1] += duration
+            if duration > totals[2]:
+                totals[2] = duration
+            totals[3] += payload
+            totals[4] += error
+
+    def wrap(self, fn, name=None, check_enabled=False):
+        """Timing wrapper for fn. With check_enabled it passes straight through while disabled."""
+        name = name or fn.__name__
+        recorder = self
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if check_enabled and not recorder.enabled:
+                    return (yield from fn(*args, **kwargs))
+                # Only time spent inside the generator counts, not the consumer's work between items
+                gen = fn(*args, **kwargs)
+                duration = 0.0
+                payload = 0
+                error = False
+                try:
+                    while True:
+                        start = time.perf_counter()
+                        try:
+                            item = next(gen)
+                        except StopIteration as e:
+                            return e.value
+                        except BaseException:
+                            error = True
+                            raise
+                        finally:
+                            duration += time.perf_counter() - start
+                        payload += payload_size(item)
+                        yield item
+                finally:
+                    gen.close()
+                    recorder.record(name, duration, payload, error)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if check_enabled and not recorder.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException:
+                    recorder.record(name, time.perf_counter() - start, 0, True)
+                    raise
+                recorder.record(name, time.perf_counter() - start, payload_size(result))
+                return result
+        return wrapper
+
+    def handler(self, fn):
+        """Wrap a UI event handler; checks the enabled flag on every call."""
+        return self.wrap(fn, "handler." + fn.__name__, check_enabled=True)
+
+    def enable(self, targets):
+        """Start recording; targets is a list of (object, method name, label) to patch."""
+        if self.enabled:
+            return
+        for obj, attr, label in targets:
+            setattr(obj, attr, self.wrap(getattr(obj, attr), label))
+            self.patched.append((obj, attr))
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        for obj, attr in self.patched:
+            try:
+                delattr(obj, attr)
+            except AttributeError:
+                pass
+        self.patched = []
+
+    def reset(self):
+        self.events.clear()
+        with self.lock:
+            self.totals = {}
+
+    def summary(self):
+        """Rows of (name, calls, seconds, max seconds, payload bytes, errors, recent p95 seconds), slowest first."""
+        recent = {}
+        for _, name, duration, _, _ in list(self.events):
+            recent.setdefault(name, []).append(duration)
+        with self.lock:
+            totals = {name: list(t) for name, t in self.totals.items()}
+        rows = []
+        for name, (calls, seconds, max_seconds, payload, errors) in totals.items():
+            durations = sorted(recent.get(name, ()))
+            p95 = durations[int(len(durations) * 0.95)] if durations else 0.0
+            rows.append((name, calls, seconds, max_seconds, payload, errors, p95))
+        rows.sort(key=lambda r: r[2], reverse=True)
+        return rows
+
+    def to_json(self):
+        return json.dumps({
+            "enabled": self.enabled,
+            "totals": {name: {"calls": calls, "seconds": seconds, "max_seconds": max_seconds,
+                              "payload_bytes": payload, "errors": errors, "recent_p95_seconds": p95}
+                       for name, calls, seconds, max_seconds, payload, errors, p95 in self.summary()},
+            "events": [{"time": ts, "name": name, "seconds": duration, "payload_bytes": payload, "error": error}
+                       for ts, name, duration, payload, error in list(self.events)],
+        }, indent=2)
+
+    def to_prometheus(self):
+        metrics = [
+            ("mm_calls_total", "counter", "Calls per instrumented function or handler", 1),
+            ("mm_duration_seconds_total", "counter", "Time spent per instrumented function or handler", 2),
+            ("mm_duration_seconds_max", "gauge", "Slowest single call", 3),
+            ("mm_payload_bytes_total", "counter", "UTF-8 bytes of strings returned", 4),
+            ("mm_errors_total", "counter", "Calls that raised", 5),
+        ]
+        rows = self.summary()
+        lines = []
+        for metric, kind, help_text, col in metrics:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for row in rows:
+                name = row[0].replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{metric}{{name="{name}"}} {row[col]}')
+        return "\n".join(lines) + "\n"
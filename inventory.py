@@ -0,0 +1,212 @@
+import os
+import gzip
+import json
+import time
+import heapq
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+FORMAT = "wan2gp-model-inventory"
+VERSION = 1
+COLUMNS = ["rel_path", "size", "mtime", "model_type"]
+META_COLUMNS = ["kind", "params", "precision"]
+HASH_COLUMN = "blake2b"
+DIFF_FIELDS = ["node", "status", "rel_path", "ref_rel_path", "size", "ref_size", "model_type", HASH_COLUMN, "ref_" + HASH_COLUMN]
+
+
+def path_key(rel_path):
+    """Sort key of a "/"-separated relative path: its components, so "a/b" sorts before "a-b/c" on every node."""
+    return tuple(rel_path.split("/"))
+
+
+def inventory_row(m, with_meta):
+    rel_path = m.rel_path.replace(os.sep, "/")
+    row = [rel_path, m.size, int(m.mtime), m.model_type]
+    if with_meta:
+        meta = m.meta or {}
+        row += [meta.get("kind"), meta.get("params"), meta.get("precision")]
+    return row
+
+
+def iter_hashed(rows, models, hasher, max_workers=4):
+    """Append the full-file hash to each row, hashing a bounded window of files in parallel."""
+    window = max_workers * 4
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mm-hash") as pool:
+        for row, m in zip(rows, models):
+            pending.append((row, pool.submit(hasher.get_hash, m.path, m.size, False)))
+            if len(pending) >= window:
+                yield finish_hash(*pending.popleft())
+        while pending:
+            yield finish_hash(*pending.popleft())
+
+
+def finish_hash(row, future):
+    try:
+        row.append(future.result())
+    except OSError:
+        row.append(None)
+    return row
+
+
+def write_inventory(path, models, node, hasher=None, with_meta=False):
+    """Stream models to a gzip JSON-lines inventory; returns the number of rows written.
+
+    The first line is a header naming the node and the columns, every other line one model as a
+    JSON array in column order, sorted by path_key(rel_path) so inventories can be merged.
+    Rows are encoded one at a time and the file is replaced atomically when complete.
+    """
+    columns = list(COLUMNS)
+    if with_meta:
+        columns += META_COLUMNS
+    if hasher is not None:
+        columns.append(HASH_COLUMN)
+    ordered = sorted(models, key=lambda m: path_key(m.rel_path.replace(os.sep, "/")))
+    rows = (inventory_row(m, with_meta) for m in ordered)
+    if hasher is not None:
+        rows = iter_hashed(rows, ordered, hasher)
+
+    header = {"format": FORMAT, "version": VERSION, "node": node, "created": time.time(), "columns": columns}
+    count = 0
+    tmp_file = path + ".tmp"
+    try:
+        with gzip.open(tmp_file, "wt", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n")
+                count += 1
+        os.replace(tmp_file, path)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    if hasher is not None:
+        hasher.save()
+    return count
+
+
+class InventoryReader:
+    """Reads an inventory lazily: the header on open, then (key, row dict) pairs in file order."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = gzip.open(path, "rt", encoding="utf-8")
+        try:
+            self.header = json.loads(self.file.readline())
+            if self.header.get("format") != FORMAT or self.header.get("version") != VERSION:
+                raise ValueError(f"{path}: not a model inventory (version {VERSION})")
+        except (ValueError, AttributeError):
+            self.file.close()
+            raise
+        self.columns = self.header["columns"]
+        self.node = self.header.get("node") or os.path.basename(path)
+
+    def __iter__(self):
+        columns = self.columns
+        prev = None
+        with self.file:
+            for line in self.file:
+                row = dict(zip(columns, json.loads(line)))
+                key = path_key(row["rel_path"])
+                if prev is not None and key < prev:
+                    raise ValueError(f"{self.path}: rows are not sorted by path ({row['rel_path']})")
+                prev = key
+                yield key, row
+
+
+def diff_inventories(paths):
+    """Compare inventories against the first one, yielding one report row per difference.
+
+    Each node's rows are "missing" (only in the reference), "extra" (only on the node) or
+    "changed" (different size, or different hash when both inventories have hashes). With
+    hashes on both sides, a missing and an extra file with the same hash are one "moved" row
+    (rel_path on the node, ref_rel_path in the reference); those missing and extra rows are held
+    back until the end of the merge. The inventories are merged in one pass (heapq.merge over
+    their sorted rows), so memory grows only with the unmatched rows and time is linear in the
+    total number of rows.
+    """
+    readers = [InventoryReader(p) for p in paths]
+    nodes = [r.node for r in readers]
+    if len(set(nodes)) < len(nodes):
+        nodes = [f"{r.node} ({os.path.basename(r.path)})" for r in readers]
+    hashed = HASH_COLUMN in readers[0].columns
+    moves = [MoveMatcher() if hashed and HASH_COLUMN in r.columns else None for r in readers]
+
+    streams = [tagged(reader, idx) for idx, reader in enumerate(readers)]
+    merged = heapq.merge(*streams, key=lambda item: item[:2])
+    for key, group in itertools.groupby(merged, key=lambda item: item[0]):
+        # The same relative path can exist under several roots of one node
+        found = {}
+        for _, idx, row in group:
+            found.setdefault(idx, []).append(row)
+        ref = found.get(0)
+        for idx in range(1, len(readers)):
+            rows = found.get(idx)
+            if ref and not rows:
+                diff = diff_row(nodes[idx], "missing", None, ref[0])
+            elif rows and not ref:
+                diff = diff_row(nodes[idx], "extra", rows[0], None)
+            else:
+                if rows and fingerprints(rows, ref) != fingerprints(ref, rows):
+                    yield diff_row(nodes[idx], "changed", rows[0], ref[0])
+                continue
+            if moves[idx] is None:
+                yield diff
+            else:
+                yield from moves[idx].add(diff)
+    for matcher in moves:
+        if matcher is not None:
+            yield from matcher.leftovers()
+
+
+class MoveMatcher:
+    """Pairs the "missing" and "extra" rows of one node that have the same hash into "moved" rows."""
+
+    def __init__(self):
+        self.waiting = {"missing": {}, "extra": {}}
+
+    def add(self, diff):
+        status = diff["status"]
+        digest = diff[HASH_COLUMN] if status == "extra" else diff["ref_" + HASH_COLUMN]
+        if digest is None:
+            # Hashing failed on that side: nothing to pair it with
+            yield diff
+            return
+        other = self.waiting["missing" if status == "extra" else "extra"]
+        partners = other.get(digest)
+        if not partners:
+            self.waiting[status].setdefault(digest, []).append(diff)
+            return
+        partner = partners.pop()
+        if not partners:
+            del other[digest]
+        extra, missing = (diff, partner) if status == "extra" else (partner, diff)
+        yield dict(extra, status="moved", ref_rel_path=missing["ref_rel_path"], ref_size=missing["ref_size"],
+                   **{"ref_" + HASH_COLUMN: missing["ref_" + HASH_COLUMN]})
+
+    def leftovers(self):
+        """The rows that found no partner, in path order."""
+        rows = [diff for by_hash in self.waiting.values() for diffs in by_hash.values() for diff in diffs]
+        rows.sort(key=lambda diff: path_key(diff["rel_path"]))
+        return rows
+
+
+def tagged(reader, idx):
+    for key, row in reader:
+        yield key, idx, row
+
+
+def fingerprints(rows, other):
+    """Sizes, plus hashes when the other side has them too, of the copies of one path."""
+    with_hash = HASH_COLUMN in rows[0] and HASH_COLUMN in other[0]
+    return sorted((r["size"], r.get(HASH_COLUMN) if with_hash else None) for r in rows)
+
+
+def diff_row(node, status, row, ref):
+    source = row or ref
+    return {"node": node, "status": status, "rel_path": source["rel_path"],
+            "ref_rel_path": ref["rel_path"] if ref else None, "size": row["size"] if row else None, "ref_size": ref["size"] if ref else None,
+            "model_type": source.get("model_type"),
+            HASH_COLUMN: row.get(HASH_COLUMN) if row else None,
+            "ref_" + HASH_COLUMN: ref.get(HASH_COLUMN) if ref else None}
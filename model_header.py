@@ -0,0 +1,110 @@
+import json
+import struct
+
+
+HEADER_EXTENSIONS = (".safetensors", ".sft")
+MAX_HEADER_SIZE = 100 * 1024 * 1024
+
+DTYPE_NAMES = {
+    "F64": "FP64", "F32": "FP32", "F16": "FP16", "BF16": "BF16",
+    "F8_E4M3": "FP8", "F8_E5M2": "FP8", "I8": "INT8", "U8": "INT8",
+}
+
+# Tensor-name markers per model family, checked in classify_keys order
+# ".alpha" alone also names Snake/BigVGAN activations, so it is not a LoRA marker by itself
+LORA_MARKERS = ("lora_down", "lora_up", "lora_A", "lora_B", "lora.down", "lora.up", "lora_te", "lora_unet")
+DIFFUSION_MARKERS = ("blocks.0.self_attn", "transformer_blocks.", "double_blocks.", "single_blocks.",
+                     "model.diffusion_model.", "joint_blocks.", "transformer.blocks.")
+LLM_MARKERS = ("lm_head.", "model.embed_tokens.")
+TEXT_ENCODER_MARKERS = ("text_model.encoder.", "encoder.block.", "shared.weight", "roberta.", "text_projection",
+                        "encoder.layer.", "conditioner.embedders.")
+VAE_MARKERS = ("decoder.conv_in.", "decoder.up_blocks.", "decoder.up.", "post_quant_conv.", "first_stage_model.",
+               "decoder.middle.", "decoder.head.")
+UPSCALER_MARKERS = ("conv_first.", "RRDB_trunk.", "conv_up1.", "body.0.rdb")
+
+
+def read_safetensors_header(path):
+    """Return the parsed JSON header of a .safetensors file without touching tensor data."""
+    with open(path, "rb") as f:
+        prefix = f.read(8)
+        if len(prefix) != 8:
+            raise ValueError("file too small")
+        (header_size,) = struct.unpack("<Q", prefix)
+        if header_size > MAX_HEADER_SIZE:
+            raise ValueError("header too large")
+        header = f.read(header_size)
+    if len(header) != header_size:
+        raise ValueError("truncated header")
+    return json.loads(header)
+
+
+def classify_keys(keys, metadata):
+    """Guess the model family from tensor names and __metadata__."""
+    if metadata and any(k.startswith("ss_") for k in metadata):
+        return "LoRA"
+    if any(m in k for k in keys for m in LORA_MARKERS):
+        return "LoRA"
+    if any(m in k for k in keys for m in DIFFUSION_MARKERS):
+        return "Diffusion"
+    if any(k.startswith(LLM_MARKERS) for k in keys):
+        return "LLM"
+    if any(m in k for k in keys for m in TEXT_ENCODER_MARKERS):
+        return "Text Encoder"
+    if any(k.startswith(VAE_MARKERS) for k in keys):
+        return "VAE"
+    if any(k.startswith(UPSCALER_MARKERS) for k in keys):
+        return "Upscaler"
+    return None
+
+
+def inspect_model(path):
+    """Header-derived facts about a model file: kind, parameter count and precision.
+
+    Returns None for formats without a readable header (.pth, .ckpt, corrupt files).
+    """
+    if not path.lower().endswith(HEADER_EXTENSIONS):
+        return None
+    try:
+        header = read_safetensors_header(path)
+    except (OSError, ValueError, RecursionError):
+        return None
+    # Malformed headers fall back to filename rules instead of aborting the scan
+    if not isinstance(header, dict):
+        return None
+    metadata = header.pop("__metadata__", None) or {}
+    if not isinstance(metadata, dict):
+        return None
+
+    params = 0
+    by_dtype = {}
+    for info in header.values():
+        if not isinstance(info, dict):
+            continue
+        shape, dtype = info.get("shape", []), info.get("dtype")
+        if not isinstance(shape, list) or not all(type(dim) is int for dim in shape) or not isinstance(dtype, str):
+            return None
+        count = 1
+        for dim in shape:
+            count *= dim
+        params += count
+        dtype = DTYPE_NAMES.get(dtype, dtype)
+        by_dtype[dtype] = by_dtype.get(dtype, 0) + count
+
+    # Quantized checkpoints keep scales and norms in float: report the dtype holding most weights
+    precision = max(by_dtype, key=by_dtype.get) if by_dtype else None
+
+    return {
+        "kind": classify_keys(list(header), metadata),
+        "params": params,
+        "precision": precision,
+    }
+
+
+def format_params(params):
+    if not params:
+        return ""
+    if params >= 1e9:
+        return f"{params / 1e9:.1f}B"
+    if params >= 1e6:
+        return f"{params / 1e6:.0f}M"
+    return f"{params / 1e3:.0f}K"
@@ -1,29 +1,35 @@
 import gradio as gr
-import os
 import json
-import subprocess
-import platform
+import time
 from datetime import datetime
 from shared.utils.plugins import WAN2GPPlugin
+from .core import ModelManagerCore, DUPLICATES_FILTER
+from .model_header import format_params
+from .delete_queue import TRASH_DIR_NAME
+from .records import type_colors
 
 
-class ModelManagerPlugin(WAN2GPPlugin):
+class ModelManagerPlugin(ModelManagerCore, WAN2GPPlugin):
     """Model Manager Plugin V2 for Wan2GP."""
     
-    def __init__(self):
-        super().__init__()
+    INSTRUMENTED_METHODS = ModelManagerCore.INSTRUMENTED_METHODS + (
+        "render_model_list", "render_detailed_list", "get_stats_html", "render_size_table", "render_disk_usage",
+        "stream_scan_updates", "build_scan_update", "on_tab_select")
+    
+    def __init__(self, data_dir=None, model_dirs=None):
+        WAN2GPPlugin.__init__(self)
+        ModelManagerCore.__init__(self, data_dir, model_dirs)
         self.name = "Model Manager"
         self.version = "2.0.0"
         self.description = "Manage installed models. View sizes, search, filter by type, and delete unused models."
         
-        self.plugin_dir = os.path.dirname(os.path.abspath(__file__))
-        self.default_model_dirs = ["ckpts"]
-        self.model_extensions = [".safetensors", ".sft", ".pth", ".pt", ".ckpt"]
-        self.usage_file = os.path.join(self.plugin_dir, "model_usage.json")
-        
-        self.models_cache = []
+        self.watch_backend = "auto"
+        self.list_page_size = 100
+        # Compute selected count / size in the browser instead of a server round-trip per checkbox
+        self.client_side_stats = True
     def setup_ui(self):
         self.request_global("server_config")
+        self.usage.install_hooks()
         self.add_tab(
             tab_id="model_manager_tab",
             label="Model Manager",
@@ -31,154 +37,42 @@ class ModelManagerPlugin(WAN2GPPlugin):
             position=4
         )
 
-    def get_model_dirs(self):
-        try:
-            if hasattr(self, 'server_config') and self.server_config:
-                paths = self.server_config.get("checkpoints_paths", self.default_model_dirs)
-                return [p for p in paths if os.path.isdir(p)]
-        except:
-            pass
-        return [d for d in self.default_model_dirs if os.path.isdir(d)]
-
-    def format_size(self, size_bytes):
-        if size_bytes < 1024:
-            return f"{size_bytes} B"
-        elif size_bytes < 1024 ** 2:
-            return f"{size_bytes / 1024:.1f} KB"
-        elif size_bytes < 1024 ** 3:
-            return f"{size_bytes / (1024 ** 2):.1f} MB"
-        else:
-            return f"{size_bytes / (1024 ** 3):.2f} GB"
-
-    def detect_model_type(self, filename, path, size_bytes):
-        name_lower = filename.lower()
-        path_lower = path.lower()
-        size_gb = size_bytes / (1024 ** 3)
-        
-        if "lora" in path_lower or "loras" in path_lower or "_lora" in name_lower:
-            return ("LoRA", "#22c55e", "🎨")
-        if "vae" in name_lower:
-            return ("VAE", "#a855f7", "🎭")
-        if any(x in name_lower for x in ["clip", "text_encoder", "t5", "umt5", "xlm", "roberta"]):
-            return ("Text Encoder", "#f97316", "📝")
-        if any(x in name_lower for x in ["llama", "qwen", "gemma", "caption", "joycaption"]):
-            return ("LLM", "#06b6d4", "🧠")
-        if any(x in name_lower for x in ["upscal", "esrgan", "swinir", "flashvsr"]):
-            return ("Upscaler", "#ec4899", "⬆️")
-        if any(x in name_lower for x in ["depth", "midas"]):
-            return ("Depth", "#8b5cf6", "🌊")
-        if any(x in name_lower for x in ["audio", "mmaudio", "roformer"]):
-            return ("Audio", "#f59e0b", "🔊")
-        if any(x in name_lower for x in ["sam", "segment"]):
-            return ("Segmentation", "#84cc16", "✂️")
-        if any(x in name_lower for x in ["wan2", "ltx", "flux", "hunyuan"]):
-            return ("Checkpoint", "#3b82f6", "🔷") if size_gb > 5 else ("Model", "#60a5fa", "📦")
-        if size_gb > 10:
-            return ("Checkpoint", "#3b82f6", "🔷")
-        elif size_gb < 0.5:
-            return ("LoRA", "#22c55e", "🎨")
-        return ("Model", "#60a5fa", "📦")
-
-    def open_folder(self, model_path):
-        if not model_path or not os.path.exists(model_path):
-            return "❌ File not found"
-        folder = os.path.dirname(model_path)
+    def parse_page(self, page):
         try:
-            if platform.system() == "Windows":
-                subprocess.Popen(f'explorer /select,"{model_path}"')
-            else:
-                subprocess.Popen(["xdg-open", folder])
-            return f"✅ Opened: {folder}"
-        except Exception as e:
-            return f"❌ Error: {e}"
+            return max(0, int(page))
+        except (TypeError, ValueError):
+            return 0
 
-    def scan_models(self, scan_dirs=None):
-        if scan_dirs is None:
-            scan_dirs = self.get_model_dirs()
-        
-        models = []
-        seen_paths = set()
-        
-        for base_dir in scan_dirs:
-            if not os.path.isdir(base_dir):
-                continue
-            abs_base_dir = os.path.abspath(base_dir)
-            for root, dirs, files in os.walk(abs_base_dir):
-                dirs[:] = [d for d in dirs if not d.startswith('.')]
-                for filename in files:
-                    ext = os.path.splitext(filename)[1].lower()
-                    if ext in self.model_extensions:
-                        full_path = os.path.abspath(os.path.join(root, filename))
-                        if full_path in seen_paths:
-                            continue
-                        seen_paths.add(full_path)
-                        try:
-                            stat = os.stat(full_path)
-                            rel_path = os.path.relpath(full_path, abs_base_dir)
-                            model_type, type_color, type_icon = self.detect_model_type(filename, full_path, stat.st_size)
-                            models.append({
-                                "name": filename,
-                                "path": full_path,
-                                "rel_path": rel_path,
-                                "base_dir": base_dir,
-                                "size": stat.st_size,
-                                "size_str": self.format_size(stat.st_size),
-                                "modified": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M"),
-                                "model_type": model_type,
-                                "type_color": type_color,
-                                "type_icon": type_icon
-                            })
-                        except OSError:
-                            continue
-        
-        models.sort(key=lambda x: x["size"], reverse=True)
-        self.models_cache = models
-        return models
+    def reset_list(self, models, selected_paths, sort_by, search_q, type_f, page=None):
+        """(list_html update, filtered models, list_page output) for showing the list back at page 0.
 
-    def filter_models(self, models, search_query="", type_filter="All"):
-        filtered = models
-        if search_query:
-            query = search_query.lower().strip()
-            filtered = [m for m in filtered if query in m["name"].lower()]
-        if type_filter and type_filter != "All":
-            filtered = [m for m in filtered if m["model_type"] == type_filter]
-        return filtered
-
-    def get_unique_types(self, models):
-        types = set(m["model_type"] for m in models)
-        return ["All"] + sorted(list(types))
+        Only page 0 is rendered here. From another page, list_page goes to "0" and its change event
+        renders the list, so this only computes the matches. page is None when the caller lacks it.
+        """
+        if page is not None and self.parse_page(page) != 0:
+            return gr.update(visible=True), self.get_catalog(models).query(sort_by, search_q, type_f), "0"
+        list_h, filtered = self.render_detailed_list(models, selected_paths, sort_by, search_q, type_f)
+        return gr.update(value=list_h, visible=True), filtered, ("0" if page is None else gr.update())
 
     def render_model_list(self, models, sort_by="size", search_query="", type_filter="All"):
         """Render list of models as CheckboxGroup choices (Grid mode)."""
-        filtered = self.filter_models(models, search_query, type_filter)
-        
-        if sort_by == "name":
-            filtered = sorted(filtered, key=lambda x: x["name"].lower())
-        elif sort_by == "date":
-            filtered = sorted(filtered, key=lambda x: x["modified"], reverse=True)
-        else:
-            filtered = sorted(filtered, key=lambda x: x["size"], reverse=True)
-        
-        choices = []
-        for m in filtered:
-            label = f"{m['type_icon']} {m['name']} | {m['size_str']}"
-            choices.append((label, m["path"]))
+        catalog = self.get_catalog(models)
+        indices = catalog.select(sort_by, search_query, type_filter)
+        # Grid labels cover every model: format them once per scan, not on every keystroke
+        labels = catalog.get_column("grid_label", lambda m: (f"{m.type_icon} {m.name} | {m.size_str}", m.path))
         
+        choices = [labels[idx] for idx in indices]
+        filtered = [models[idx] for idx in indices]
         return choices, filtered
 
-    def render_detailed_list(self, models, selected_paths, sort_by="size", search_query="", type_filter="All"):
-        """Render detailed HTML list (List mode)."""
-        filtered = self.filter_models(models, search_query, type_filter)
-        
-        if sort_by == "name":
-            filtered = sorted(filtered, key=lambda x: x["name"].lower())
-        elif sort_by == "date":
-            filtered = sorted(filtered, key=lambda x: x["modified"], reverse=True)
-        else:
-            filtered = sorted(filtered, key=lambda x: x["size"], reverse=True)
-        
+    def render_detailed_list(self, models, selected_paths, sort_by="size", search_query="", type_filter="All", page=0):
+        """Render one page of the detailed HTML list (List mode)."""
+        filtered = self.get_catalog(models).query(sort_by, search_query, type_filter)
+        return self.render_list_page(filtered, selected_paths, page), filtered
+
+    def render_list_page(self, filtered, selected_paths, page=0):
         if not filtered:
-            return "<div style='color:#888;padding:40px;text-align:center;'>📭 No models found</div>", filtered
+            return "<div style='color:#888;padding:40px;text-align:center;'>📭 No models found</div>"
         
         html = """<style>
             .mm-list{max-height:450px;overflow-y:auto;border:1px solid #374151;border-radius:10px;background:#1f2937;}
@@ -195,66 +89,173 @@ class ModelManagerPlugin(WAN2GPPlugin):
             .mm-usage.never{color:#ef4444;}
             .mm-date{font-size:0.7em;color:#6b7280;min-width:90px;}
             .mm-size{font-weight:700;color:#60a5fa;font-size:0.9em;min-width:70px;text-align:right;}
-        </style><div class="mm-list">"""
+            .mm-pager{display:flex;align-items:center;justify-content:center;gap:16px;padding:8px;color:#9ca3af;font-size:0.85em;}
+            .mm-pager button{padding:4px 12px;border:1px solid #374151;border-radius:6px;background:#1f2937;color:#fff;cursor:pointer;}
+            .mm-pager button:disabled{opacity:0.4;cursor:default;}
+        </style>"""
+        
+        page_count = (len(filtered) + self.list_page_size - 1) // self.list_page_size
+        page = max(0, min(page, page_count - 1))
+        start = page * self.list_page_size
+        page_models = filtered[start:start + self.list_page_size]
+        
+        pager = ""
+        if page_count > 1:
+            prev_dis = "disabled" if page == 0 else ""
+            next_dis = "disabled" if page >= page_count - 1 else ""
+            pager = f'''<div class="mm-pager">
+                <button {prev_dis} onclick="mmPage({page - 1})">◀ Prev</button>
+                <span>Page {page + 1} / {page_count} · {start + 1}–{start + len(page_models)} of {len(filtered)} models</span>
+                <button {next_dis} onclick="mmPage({page + 1})">Next ▶</button>
+            </div>'''
         
-        for m in filtered:
-            is_sel = m["path"] in selected_paths
+        rows = []
+        for m in page_models:
+            path = m.path
+            is_sel = path in selected_paths
             sel_class = "sel" if is_sel else ""
             checked = "checked" if is_sel else ""
-            path_esc = m["path"].replace("\\", "\\\\").replace("'", "\\'")
+            path_esc = path.replace("\\", "\\\\").replace("'", "\\'")
             
-            html += f'''<div class="mm-item {sel_class}">
+            rows.append(f'''<div class="mm-item {sel_class}">
                 <input type="checkbox" class="mm-cb" {checked} onchange="mmToggle(this, '{path_esc}')">
-                <div class="mm-info"><div class="mm-name">{m["name"]}</div><div class="mm-path">📁 {m["rel_path"]}</div></div>
-                <span class="mm-type" style="background:{m['type_color']};color:white;">{m['type_icon']} {m['model_type']}</span>
-                <span class="mm-date">📅 {m["modified"]}</span>
-                <span class="mm-size">{m["size_str"]}</span>
-            </div>'''
-        
-        html += "</div>"
-        return html, filtered
+                <div class="mm-info"><div class="mm-name">{m.name}</div><div class="mm-path">📁 {m.rel_path}{self.render_header_info(m)}</div></div>
+                <span class="mm-type" style="background:{m.type_color};color:white;">{m.type_icon} {m.model_type}</span>
+                {self.render_usage(path)}
+                <span class="mm-date">📅 {m.modified}</span>
+                <span class="mm-size">{m.size_str}</span>
+            </div>''')
+        
+        html += pager + '<div class="mm-list">' + "".join(rows) + "</div>" + pager
+        return html
+
+    def render_header_info(self, m):
+        parts = [p for p in (format_params(m.params), m.precision) if p]
+        return " · " + " · ".join(parts) if parts else ""
+
+    def render_usage(self, path):
+        usage = self.usage.get(path)
+        if usage is None:
+            return '<span class="mm-usage never">⚠️ Never used</span>'
+        count, last_used = usage
+        last = datetime.fromtimestamp(last_used).strftime("%Y-%m-%d %H:%M")
+        return f'<span class="mm-usage" title="Last used: {last}">🔁 {count}×</span>'
 
-    def get_stats_html(self, models, selected_paths):
-        total_size = sum(m["size"] for m in models)
-        selected_size = sum(m["size"] for m in models if m["path"] in selected_paths)
+    def get_stats_html(self, models, selected_paths, scanning=False, total_size=None):
+        """Stats bar for the filtered models. selected_paths is a set; To Delete covers every selected file."""
+        if total_size is None:
+            total_size = sum(m.size for m in models)
+        selected_size = self.snapshot.catalog.selected_size(selected_paths)
+        scanning_html = ""
+        if scanning:
+            scanning_html = '<div style="text-align:center;"><div style="font-size:1.3em;font-weight:700;">⏳</div><div style="font-size:0.75em;opacity:0.8;">Scanning...</div></div>'
         
         return f"""
         <div style="display:flex; gap:30px; padding:12px 20px; background:linear-gradient(135deg,#1e3a5f,#2d4a6f); border-radius:10px; color:white; margin-bottom:10px;">
             <div style="text-align:center;"><div style="font-size:1.3em;font-weight:700;">📦 {len(models)}</div><div style="font-size:0.75em;opacity:0.8;">Models</div></div>
             <div style="text-align:center;"><div style="font-size:1.3em;font-weight:700;">💾 {self.format_size(total_size)}</div><div style="font-size:0.75em;opacity:0.8;">Total</div></div>
-            <div style="text-align:center;"><div style="font-size:1.3em;font-weight:700;">✅ {len(selected_paths)}</div><div style="font-size:0.75em;opacity:0.8;">Selected</div></div>
-            <div style="text-align:center;"><div style="font-size:1.3em;font-weight:700;">🗑️ {self.format_size(selected_size)}</div><div style="font-size:0.75em;opacity:0.8;">To Delete</div></div>
+            <div style="text-align:center;"><div id="mm_stat_sel" style="font-size:1.3em;font-weight:700;">✅ {len(selected_paths)}</div><div style="font-size:0.75em;opacity:0.8;">Selected</div></div>
+            <div style="text-align:center;"><div id="mm_stat_del" style="font-size:1.3em;font-weight:700;">🗑️ {self.format_size(selected_size)}</div><div style="font-size:0.75em;opacity:0.8;">To Delete</div></div>
+            {scanning_html}
         </div>
         """
 
-    def delete_models(self, selected_paths):
-        if not selected_paths:
-            return "❌ No models selected for deletion"
+    def render_size_table(self, models):
+        """Compact path -> size table shipped to the browser once per scan for client-side selection stats."""
+        sizes = json.dumps({m.path: m.size for m in models}, separators=(",", ":")).replace("</", "<\\/")
+        return f'<script type="application/json" id="mm_sizes">{sizes}</script>'
+
+    def size_table_update(self, sent_version):
+        """(size_table, sizes_version) outputs: the current snapshot's size table, or no update when
+        this session already has the table of that snapshot version."""
+        snapshot = self.snapshot
+        if snapshot.version == sent_version:
+            return gr.update(), gr.update()
+        return self.render_size_table(snapshot.models), snapshot.version
+
+    def render_disk_usage(self):
+        """Breakdown panel: totals, a treemap strip per type and the biggest roots, types and folders."""
+        snapshot = self.snapshot
+        apparent, alloc, files, linked = snapshot.disk_totals
+        if not files:
+            return "<div style='color:#888;padding:20px;text-align:center;'>📭 No models scanned yet</div>"
         
-        deleted = []
-        errors = []
-        freed = 0
+        html = """<style>
+            .mm-du-head{display:flex;gap:30px;padding:8px 4px;color:#e5e7eb;font-size:0.9em;}
+            .mm-du-map{display:flex;height:38px;border-radius:8px;overflow:hidden;margin:8px 0 14px 0;}
+            .mm-du-map div{overflow:hidden;white-space:nowrap;font-size:0.7em;color:white;padding:4px;min-width:2px;}
+            .mm-du-cols{display:flex;gap:20px;flex-wrap:wrap;}
+            .mm-du-col{flex:1;min-width:260px;}
+            .mm-du-title{font-weight:700;color:#fff;margin-bottom:6px;font-size:0.9em;}
+            .mm-du-row{position:relative;padding:4px 8px;margin-bottom:3px;border-radius:4px;background:#1f2937;font-size:0.75em;color:#e5e7eb;display:flex;justify-content:space-between;gap:8px;}
+            .mm-du-bar{position:absolute;left:0;top:0;bottom:0;background:rgba(59,130,246,0.25);border-radius:4px;}
+            .mm-du-row span{position:relative;overflow:hidden;text-overflow:ellipsis;white-space:nowrap;}
+        </style>"""
+        html += f'''<div class="mm-du-head">
+            <span>💾 Apparent: <b>{self.format_size(apparent)}</b></span>
+            <span>🧱 Allocated: <b>{self.format_size(alloc)}</b></span>
+            <span>📦 {files} files</span>
+            <span>🔗 {linked} hardlinks counted once</span>
+        </div>'''
+        
+        colors = type_colors()
+        tiles = []
+        for key, size, _alloc, count in snapshot.top("type", 20):
+            pct = 100 * size / apparent if apparent else 0
+            tiles.append(f'<div style="flex:{max(pct, 0.1):.2f};background:{colors.get(key, "#60a5fa")};" '
+                         f'title="{key}: {self.format_size(size)} ({count} files)">{key} {pct:.0f}%</div>')
+        html += '<div class="mm-du-map">' + "".join(tiles) + "</div>"
+        
+        html += '<div class="mm-du-cols">'
+        for kind, title in (("root", "📁 Roots"), ("type", "🏷️ Types"), ("dir", "📂 Folders")):
+            rows = snapshot.top(kind, 10)
+            biggest = rows[0][1] if rows else 0
+            html += f'<div class="mm-du-col"><div class="mm-du-title">{title}</div>'
+            for key, size, size_alloc, count in rows:
+                width = 100 * size / biggest if biggest else 0
+                html += (f'<div class="mm-du-row" title="Allocated: {self.format_size(size_alloc)}">'
+                         f'<div class="mm-du-bar" style="width:{width:.1f}%"></div>'
+                         f'<span>{key} ({count})</span><span>{self.format_size(size)}</span></div>')
+            html += "</div>"
+        html += "</div>"
+        return html
+
+    def render_diagnostics(self):
+        """Timing table of instrumented functions and handlers, slowest total first."""
+        rows = self.instrumentation.summary()
+        if not rows:
+            msg = "No calls recorded yet" if self.instrumentation.enabled else "Recording is off: tick Record timings"
+            return f"<div style='color:#888;padding:20px;text-align:center;'>{msg}</div>"
         
-        for path in selected_paths:
-            try:
-                if os.path.exists(path):
-                    size = os.path.getsize(path)
-                    os.remove(path)
-                    deleted.append(os.path.basename(path))
-                    freed += size
-            except Exception as e:
-                errors.append(f"{os.path.basename(path)}: {e}")
-        
-        msg = ""
-        if deleted:
-            msg = f"✅ Deleted {len(deleted)} files ({self.format_size(freed)} freed)\n"
-            msg += "• " + "\n• ".join(deleted[:5])
-            if len(deleted) > 5:
-                msg += f"\n... and {len(deleted)-5} more"
-        if errors:
-            msg += f"\n\n⚠️ Errors:\n• " + "\n• ".join(errors[:3])
-        
-        return msg if msg else "❌ Nothing deleted"
+        html = """<style>
+            .mm-diag{width:100%;border-collapse:collapse;font-size:0.75em;color:#e5e7eb;}
+            .mm-diag th{text-align:right;color:#9ca3af;font-weight:600;padding:4px 8px;border-bottom:1px solid #374151;}
+            .mm-diag td{text-align:right;padding:3px 8px;border-bottom:1px solid #1f2937;font-variant-numeric:tabular-nums;}
+            .mm-diag th:first-child,.mm-diag td:first-child{text-align:left;}
+        </style>"""
+        html += ('<table class="mm-diag"><tr><th>Function</th><th>Calls</th><th>Total</th><th>Avg</th>'
+                 '<th>p95 (recent)</th><th>Max</th><th>Avg payload</th><th>Errors</th></tr>')
+        for name, calls, seconds, max_seconds, payload, errors, p95 in rows:
+            html += (f"<tr><td>{name}</td><td>{calls}</td><td>{seconds * 1000:.1f} ms</td>"
+                     f"<td>{seconds * 1000 / calls:.2f} ms</td><td>{p95 * 1000:.2f} ms</td>"
+                     f"<td>{max_seconds * 1000:.2f} ms</td><td>{self.format_size(payload // calls)}</td>"
+                     f"<td>{errors or ''}</td></tr>")
+        return html + "</table>"
+
+    def format_delete_progress(self, jobs):
+        done = [j for j in jobs if j["status"] == "deleted"]
+        pending = [j for j in jobs if j["status"] in ("staged", "deleting")]
+        if pending:
+            msg = f"🗑️ Deleting in background... {len(done)}/{len(jobs)} done"
+            if any(j["status"] == "staged" and j["trash"] for j in pending):
+                msg += f"\n↩️ Files stay in {TRASH_DIR_NAME} for {self.delete_queue.grace_period:.0f}s, click Undo to restore them"
+            return msg
+        restored = [j for j in jobs if j["status"] == "restored"]
+        errors = [f"{j['name']}: {j['error']}" for j in jobs if j["status"] == "error"]
+        msg = self.format_delete_result([j["name"] for j in done], errors, sum(j["size"] for j in done))
+        if restored:
+            msg = f"↩️ Restored {len(restored)} files\n" + (msg if done or errors else "")
+        return msg.strip()
 
     def create_manager_ui(self):
         """Create the Model Manager UI using native Gradio components."""
@@ -263,7 +264,7 @@ class ModelManagerPlugin(WAN2GPPlugin):
             gr.Markdown("### 📦 Model Manager")
         
         with gr.Row():
-            search_box = gr.Textbox(label="🔍 Search", placeholder="Filter by name...", scale=2)
+            search_box = gr.Textbox(label="🔍 Search", placeholder="Filter by name or path...", scale=2)
             type_filter = gr.Dropdown(choices=["All"], value="All", label="🏷️ Type", scale=1)
             sort_dropdown = gr.Dropdown(
                 choices=[("Size ↓", "size"), ("Name", "name"), ("Date", "date")],
@@ -273,6 +274,7 @@ class ModelManagerPlugin(WAN2GPPlugin):
             refresh_btn = gr.Button("🔄", scale=0, min_width=50)
         
         stats_html = gr.HTML()
+        size_table = gr.HTML(visible=False)
         
         # Grid view (CheckboxGroup)
         model_selector = gr.CheckboxGroup(
@@ -285,18 +287,63 @@ class ModelManagerPlugin(WAN2GPPlugin):
         # List view (HTML + hidden selection state)
         list_html = gr.HTML(visible=False)
         list_selection = gr.Textbox(visible=False, value="[]", elem_id="mm_list_sel")
+        list_page = gr.Textbox(visible=False, value="0", elem_id="mm_list_page")
         
         with gr.Row():
             open_folder_btn = gr.Button("📂 Open Folder", scale=1)
+            dupes_btn = gr.Button("🔁 Find Duplicates", scale=1)
             delete_btn = gr.Button("🗑️ Delete Selected", variant="stop", scale=1)
+            undo_btn = gr.Button("↩️ Undo", scale=0, min_width=80)
         
         status_box = gr.Textbox(label="Status", interactive=False, lines=3)
+        # Per-session state: delete batches this session may undo (the catalog itself is shared)
+        delete_batches = gr.State([])
+        # Batch queued by the last Delete click (None if it queued nothing), for stream_delete_progress
+        delete_batch = gr.State(None)
+        # Snapshot version of the size table this session's browser holds (for client-side stats)
+        sizes_version = gr.State(-1)
+        
+        with gr.Accordion("📊 Disk Usage", open=False):
+            disk_usage_btn = gr.Button("📊 Show breakdown", size="sm")
+            disk_usage_html = gr.HTML()
+        
+        with gr.Accordion("🩺 Diagnostics", open=False):
+            with gr.Row():
+                diag_enabled = gr.Checkbox(label="Record timings", value=self.instrumentation.enabled, scale=1)
+                diag_refresh_btn = gr.Button("🔄 Update", size="sm", scale=0, min_width=90)
+                diag_reset_btn = gr.Button("🧹 Reset", size="sm", scale=0, min_width=90)
+                diag_format = gr.Radio(choices=["JSON", "Prometheus"], value="JSON", show_label=False, scale=1)
+                diag_export_btn = gr.Button("📤 Export", size="sm", scale=0, min_width=90)
+            diag_html = gr.HTML(self.render_diagnostics())
+            diag_export = gr.Textbox(label="Export", lines=12, max_lines=30, visible=False)
         
         with gr.Accordion("⚠️ Warning", open=False):
-            gr.Markdown("**Deletion is permanent!** Files do NOT go to recycle bin.")
+            gr.Markdown(f"**Deletion is permanent!** Files do NOT go to recycle bin: they wait in a hidden "
+                        f"`{TRASH_DIR_NAME}` folder for {self.delete_queue.grace_period:.0f} seconds "
+                        f"(**↩️ Undo** restores them) and are then removed.")
         
         # Add JS for list mode selection
         self.add_custom_js("""
+            window.mmFormatSize = function(b) {
+                if (b < 1024) return b + ' B';
+                if (b < 1024 ** 2) return (b / 1024).toFixed(1) + ' KB';
+                if (b < 1024 ** 3) return (b / 1024 ** 2).toFixed(1) + ' MB';
+                return (b / 1024 ** 3).toFixed(2) + ' GB';
+            }
+            window.mmSelStats = function(arr) {
+                const table = document.getElementById('mm_sizes');
+                if (!table) return;
+                if (window.mmSizesEl !== table) {
+                    try { window.mmSizes = JSON.parse(table.textContent || '{}'); } catch(e) { window.mmSizes = {}; }
+                    window.mmSizesEl = table;
+                }
+                let size = 0;
+                for (const p of arr) size += window.mmSizes[p] || 0;
+                const selEl = document.getElementById('mm_stat_sel');
+                const delEl = document.getElementById('mm_stat_del');
+                if (selEl) selEl.textContent = '✅ ' + arr.length;
+                if (delEl) delEl.textContent = '🗑️ ' + mmFormatSize(size);
+            }
             window.mmToggle = function(cb, path) {
                 const sel = document.getElementById('mm_list_sel');
                 if (!sel) return;
@@ -313,40 +360,35 @@ class ModelManagerPlugin(WAN2GPPlugin):
                 }
                 ta.value = JSON.stringify(arr);
                 ta.dispatchEvent(new Event('input', {bubbles:true}));
+                mmSelStats(arr);
+            }
+            window.mmPage = function(page) {
+                const el = document.getElementById('mm_list_page');
+                if (!el) return;
+                const ta = el.querySelector('textarea');
+                if (!ta) return;
+                ta.value = String(page);
+                ta.dispatchEvent(new Event('input', {bubbles:true}));
             }
         """)
         
         # Functions
-        def do_refresh(sort_by, search_q, type_f, view):
-            models = self.scan_models()
-            choices, filtered = self.render_model_list(models, sort_by, search_q, type_f)
-            types = self.get_unique_types(models)
-            stats = self.get_stats_html(filtered, [])
-            
-            is_list = "List" in view
-            if is_list:
-                list_h, _ = self.render_detailed_list(models, set(), sort_by, search_q, type_f)
-                return (gr.update(choices=choices, value=[], visible=not is_list), 
-                        stats, gr.update(choices=types), "",
-                        gr.update(value=list_h, visible=is_list), "[]")
-            else:
-                return (gr.update(choices=choices, value=[], visible=True), 
-                        stats, gr.update(choices=types), "",
-                        gr.update(visible=False), "[]")
+        def do_refresh(sort_by, search_q, type_f, view, page):
+            yield from self.stream_scan_updates(sort_by, search_q, type_f, "List" in view, force=True, page=page)
         
-        def on_view_change(view, sort_by, search_q, type_f, grid_sel, list_sel_json):
+        def on_view_change(view, sort_by, search_q, type_f, grid_sel, list_sel_json, page, sizes):
             models = self.models_cache or self.scan_models()
             is_list = "List" in view
             
             if is_list:
                 # Switch to list - transfer selection
                 sel = set(grid_sel or [])
-                list_h, filtered = self.render_detailed_list(models, sel, sort_by, search_q, type_f)
+                list_update, filtered, page_out = self.reset_list(models, sel, sort_by, search_q, type_f, page)
                 stats = self.get_stats_html(filtered, sel)
                 return (gr.update(visible=False), 
-                        gr.update(value=list_h, visible=True), 
+                        list_update, 
                         json.dumps(list(sel)),
-                        stats)
+                        stats, page_out, *self.size_table_update(sizes))
             else:
                 # Switch to grid - transfer selection
                 sel = []
@@ -355,15 +397,15 @@ class ModelManagerPlugin(WAN2GPPlugin):
                 except:
                     pass
                 choices, filtered = self.render_model_list(models, sort_by, search_q, type_f)
-                valid = [c[1] for c in choices]
+                valid = {c[1] for c in choices}
                 kept = [s for s in sel if s in valid]
-                stats = self.get_stats_html(filtered, kept)
+                stats = self.get_stats_html(filtered, set(kept))
                 return (gr.update(choices=choices, value=kept, visible=True), 
                         gr.update(visible=False), 
                         "[]",
-                        stats)
+                        stats, gr.update(), *self.size_table_update(sizes))
         
-        def on_filter_change(sort_by, search_q, type_f, grid_sel, view, list_sel_json):
+        def on_filter_change(sort_by, search_q, type_f, grid_sel, view, list_sel_json, page, sizes):
             models = self.models_cache or self.scan_models()
             is_list = "List" in view
             
@@ -373,20 +415,21 @@ class ModelManagerPlugin(WAN2GPPlugin):
                     sel = set(json.loads(list_sel_json)) if list_sel_json else set()
                 except:
                     pass
-                list_h, filtered = self.render_detailed_list(models, sel, sort_by, search_q, type_f)
+                list_update, filtered, page_out = self.reset_list(models, sel, sort_by, search_q, type_f, page)
                 stats = self.get_stats_html(filtered, sel)
-                return gr.update(), gr.update(value=list_h), stats
+                return gr.update(), list_update, stats, page_out, *self.size_table_update(sizes)
             else:
                 choices, filtered = self.render_model_list(models, sort_by, search_q, type_f)
-                valid = [c[1] for c in choices]
+                valid = {c[1] for c in choices}
                 kept = [s for s in (grid_sel or []) if s in valid]
-                stats = self.get_stats_html(filtered, kept)
-                return gr.update(choices=choices, value=kept), gr.update(), stats
+                stats = self.get_stats_html(filtered, set(kept))
+                return (gr.update(choices=choices, value=kept), gr.update(), stats, gr.update(),
+                        *self.size_table_update(sizes))
         
         def on_grid_selection(selected, sort_by, search_q, type_f):
             models = self.models_cache or self.scan_models()
             _, filtered = self.render_model_list(models, sort_by, search_q, type_f)
-            stats = self.get_stats_html(filtered, selected or [])
+            stats = self.get_stats_html(filtered, set(selected or []))
             return stats
         
         def on_list_selection(list_sel_json, sort_by, search_q, type_f):
@@ -396,12 +439,20 @@ class ModelManagerPlugin(WAN2GPPlugin):
             except:
                 pass
             models = self.models_cache or self.scan_models()
-            _, filtered = self.render_detailed_list(models, set(sel), sort_by, search_q, type_f)
-            stats = self.get_stats_html(filtered, sel)
-            list_h, _ = self.render_detailed_list(models, set(sel), sort_by, search_q, type_f)
-            return stats, list_h
+            filtered = self.get_catalog(models).query(sort_by, search_q, type_f)
+            return self.get_stats_html(filtered, set(sel))
+        
+        def on_page_change(page, list_sel_json, sort_by, search_q, type_f, sizes):
+            sel = set()
+            try:
+                sel = set(json.loads(list_sel_json)) if list_sel_json else set()
+            except:
+                pass
+            models = self.models_cache or self.scan_models()
+            list_h, _ = self.render_detailed_list(models, sel, sort_by, search_q, type_f, self.parse_page(page))
+            return gr.update(value=list_h), *self.size_table_update(sizes)
         
-        def do_delete(grid_sel, list_sel_json, view, sort_by, search_q, type_f):
+        def do_delete(grid_sel, list_sel_json, view, sort_by, search_q, type_f, page, batches, sizes):
             is_list = "List" in view
             if is_list:
                 try:
@@ -411,17 +462,81 @@ class ModelManagerPlugin(WAN2GPPlugin):
             else:
                 sel = grid_sel or []
             
-            msg = self.delete_models(sel)
-            models = self.scan_models()
+            if not sel:
+                return ("❌ No models selected for deletion", gr.update(), gr.update(), gr.update(), gr.update(), gr.update(),
+                        gr.update(), gr.update(), None)
             
+            # Returns once the files are staged: stream_delete_progress follows the worker from
+            # there without holding this listener (and other sessions' deletes queued behind it)
+            batch_id, jobs = self.queue_delete(sel)
+            batches = (batches or []) + [batch_id]
+            models = self.models_cache
+            msg = self.format_delete_progress(jobs)
             if is_list:
-                list_h, filtered = self.render_detailed_list(models, set(), sort_by, search_q, type_f)
-                stats = self.get_stats_html(filtered, [])
-                return msg, gr.update(), gr.update(value=list_h), "[]", stats
+                list_h, filtered = self.render_detailed_list(models, set(), sort_by, search_q, type_f, self.parse_page(page))
+                stats = self.get_stats_html(filtered, set())
+                return (msg, gr.update(), gr.update(value=list_h), "[]", stats, *self.size_table_update(sizes), batches,
+                        batch_id)
+            choices, filtered = self.render_model_list(models, sort_by, search_q, type_f)
+            stats = self.get_stats_html(filtered, set())
+            return (msg, gr.update(choices=choices, value=[]), gr.update(), "[]", stats, *self.size_table_update(sizes),
+                    batches, batch_id)
+        
+        def stream_delete_progress(batch_id):
+            # Runs as its own event (own concurrency group, no limit), so polling the worker
+            # never holds the queue that other sessions' deletes go through
+            if batch_id is None:
+                # Nothing was queued by this click (e.g. empty selection): keep its message
+                yield gr.update()
+                return
+            msg = None
+            while True:
+                jobs = self.delete_queue.batch_jobs(batch_id)
+                new_msg = self.format_delete_progress(jobs)
+                if new_msg != msg:
+                    msg = new_msg
+                    yield msg
+                if not any(j["status"] in ("staged", "deleting") for j in jobs):
+                    break
+                time.sleep(0.5)
+        
+        def do_undo(view, sort_by, search_q, type_f, page, batches, sizes):
+            # Only this session's deletions: other users' batches are theirs to undo
+            restored = self.undo_delete(batches or [])
+            if not restored:
+                # Nothing is redrawn, so the selection still matches the ticked rows
+                return "❌ Nothing to restore", gr.update(), gr.update(), gr.update(), gr.update(), gr.update(), gr.update(), []
+            msg = f"↩️ Restored {len(restored)} files"
+            models = self.models_cache
+            if "List" in view:
+                list_h, filtered = self.render_detailed_list(models, set(), sort_by, search_q, type_f, self.parse_page(page))
+                return (msg, gr.update(), gr.update(value=list_h), "[]", self.get_stats_html(filtered, set()),
+                        *self.size_table_update(sizes), [])
+            choices, filtered = self.render_model_list(models, sort_by, search_q, type_f)
+            return (msg, gr.update(choices=choices, value=[]), gr.update(), "[]", self.get_stats_html(filtered, set()),
+                    *self.size_table_update(sizes), [])
+        
+        def do_find_duplicates(sort_by, search_q, view, current_type, page, sizes):
+            yield (gr.update(), gr.update(), gr.update(), gr.update(), "⏳ Comparing files with the same size...",
+                   gr.update(), gr.update(), gr.update(), gr.update())
+            models = self.models_cache or self.scan_models()
+            msg = self.find_duplicates(models)
+            type_f = DUPLICATES_FILTER if self.duplicate_paths else "All"
+            types = gr.update(choices=self.get_unique_types(models), value=type_f)
+            # The selection is dropped like on every re-render
+            if type_f != current_type:
+                # type_filter.change re-renders the list with the new filter
+                yield gr.update(), gr.update(), gr.update(), types, msg, "[]", gr.update(), gr.update(), gr.update()
+            elif "List" in view:
+                list_update, filtered, page_out = self.reset_list(models, set(), sort_by, search_q, type_f, page)
+                stats = self.get_stats_html(filtered, set())
+                yield (gr.update(), list_update, stats, types, msg, "[]", page_out,
+                       *self.size_table_update(sizes))
             else:
                 choices, filtered = self.render_model_list(models, sort_by, search_q, type_f)
-                stats = self.get_stats_html(filtered, [])
-                return msg, gr.update(choices=choices, value=[]), gr.update(), "[]", stats
+                stats = self.get_stats_html(filtered, set())
+                yield (gr.update(choices=choices, value=[]), gr.update(), stats, types, msg, "[]", gr.update(),
+                       *self.size_table_update(sizes))
         
         def do_open_folder(grid_sel, list_sel_json, view):
             is_list = "List" in view
@@ -437,61 +552,123 @@ class ModelManagerPlugin(WAN2GPPlugin):
                 return "❌ Select a model first"
             return self.open_folder(sel[0])
         
-        # Wire events
+        def on_diag_toggle(enabled):
+            self.set_instrumentation(enabled)
+            return self.render_diagnostics()
+        
+        def on_diag_reset():
+            self.instrumentation.reset()
+            return self.render_diagnostics()
+        
+        def on_diag_export(fmt):
+            text = self.instrumentation.to_prometheus() if fmt == "Prometheus" else self.instrumentation.to_json()
+            return gr.update(value=text, visible=True)
+        
+        # Wire events (handlers are timed while diagnostics recording is on)
+        timed = self.instrumentation.handler
         refresh_btn.click(
-            fn=do_refresh,
-            inputs=[sort_dropdown, search_box, type_filter, view_mode],
-            outputs=[model_selector, stats_html, type_filter, status_box, list_html, list_selection]
+            fn=timed(do_refresh),
+            inputs=[sort_dropdown, search_box, type_filter, view_mode, list_page],
+            outputs=[model_selector, stats_html, type_filter, status_box, list_html, list_selection, list_page, size_table,
+                     sizes_version]
         )
         
         view_mode.change(
-            fn=on_view_change,
-            inputs=[view_mode, sort_dropdown, search_box, type_filter, model_selector, list_selection],
-            outputs=[model_selector, list_html, list_selection, stats_html]
+            fn=timed(on_view_change),
+            inputs=[view_mode, sort_dropdown, search_box, type_filter, model_selector, list_selection, list_page, sizes_version],
+            outputs=[model_selector, list_html, list_selection, stats_html, list_page, size_table, sizes_version]
         )
         
         search_box.change(
-            fn=on_filter_change,
-            inputs=[sort_dropdown, search_box, type_filter, model_selector, view_mode, list_selection],
-            outputs=[model_selector, list_html, stats_html]
+            fn=timed(on_filter_change),
+            inputs=[sort_dropdown, search_box, type_filter, model_selector, view_mode, list_selection, list_page, sizes_version],
+            outputs=[model_selector, list_html, stats_html, list_page, size_table, sizes_version]
         )
         
         type_filter.change(
-            fn=on_filter_change,
-            inputs=[sort_dropdown, search_box, type_filter, model_selector, view_mode, list_selection],
-            outputs=[model_selector, list_html, stats_html]
+            fn=timed(on_filter_change),
+            inputs=[sort_dropdown, search_box, type_filter, model_selector, view_mode, list_selection, list_page, sizes_version],
+            outputs=[model_selector, list_html, stats_html, list_page, size_table, sizes_version]
         )
         
         sort_dropdown.change(
-            fn=on_filter_change,
-            inputs=[sort_dropdown, search_box, type_filter, model_selector, view_mode, list_selection],
-            outputs=[model_selector, list_html, stats_html]
+            fn=timed(on_filter_change),
+            inputs=[sort_dropdown, search_box, type_filter, model_selector, view_mode, list_selection, list_page, sizes_version],
+            outputs=[model_selector, list_html, stats_html, list_page, size_table, sizes_version]
         )
         
-        model_selector.change(
-            fn=on_grid_selection,
-            inputs=[model_selector, sort_dropdown, search_box, type_filter],
-            outputs=[stats_html]
-        )
+        if self.client_side_stats:
+            # Stats are updated by mmSelStats in the browser, list selection needs no event at all
+            model_selector.change(
+                fn=None,
+                inputs=[model_selector],
+                outputs=None,
+                js="(sel) => { mmSelStats(sel || []); }"
+            )
+        else:
+            model_selector.change(
+                fn=timed(on_grid_selection),
+                inputs=[model_selector, sort_dropdown, search_box, type_filter],
+                outputs=[stats_html]
+            )
+            
+            list_selection.change(
+                fn=timed(on_list_selection),
+                inputs=[list_selection, sort_dropdown, search_box, type_filter],
+                outputs=[stats_html]
+            )
         
-        list_selection.change(
-            fn=on_list_selection,
-            inputs=[list_selection, sort_dropdown, search_box, type_filter],
-            outputs=[stats_html, list_html]
+        list_page.change(
+            fn=timed(on_page_change),
+            inputs=[list_page, list_selection, sort_dropdown, search_box, type_filter, sizes_version],
+            outputs=[list_html, size_table, sizes_version]
         )
         
         delete_btn.click(
-            fn=do_delete,
-            inputs=[model_selector, list_selection, view_mode, sort_dropdown, search_box, type_filter],
-            outputs=[status_box, model_selector, list_html, list_selection, stats_html]
+            fn=timed(do_delete),
+            inputs=[model_selector, list_selection, view_mode, sort_dropdown, search_box, type_filter, list_page, delete_batches,
+                    sizes_version],
+            outputs=[status_box, model_selector, list_html, list_selection, stats_html, size_table, sizes_version, delete_batches,
+                     delete_batch]
+        ).then(
+            fn=stream_delete_progress,
+            inputs=[delete_batch],
+            outputs=[status_box],
+            concurrency_limit=None,
+            concurrency_id="mm_delete_progress"
+        )
+        
+        disk_usage_btn.click(
+            fn=timed(self.render_disk_usage),
+            inputs=[],
+            outputs=[disk_usage_html]
+        )
+        
+        undo_btn.click(
+            fn=timed(do_undo),
+            inputs=[view_mode, sort_dropdown, search_box, type_filter, list_page, delete_batches, sizes_version],
+            outputs=[status_box, model_selector, list_html, list_selection, stats_html, size_table, sizes_version,
+                     delete_batches]
+        )
+        
+        dupes_btn.click(
+            fn=timed(do_find_duplicates),
+            inputs=[sort_dropdown, search_box, view_mode, type_filter, list_page, sizes_version],
+            outputs=[model_selector, list_html, stats_html, type_filter, status_box, list_selection, list_page, size_table,
+                     sizes_version]
         )
         
         open_folder_btn.click(
-            fn=do_open_folder,
+            fn=timed(do_open_folder),
             inputs=[model_selector, list_selection, view_mode],
             outputs=[status_box]
         )
         
+        diag_enabled.change(fn=on_diag_toggle, inputs=[diag_enabled], outputs=[diag_html])
+        diag_refresh_btn.click(fn=self.render_diagnostics, inputs=[], outputs=[diag_html])
+        diag_reset_btn.click(fn=on_diag_reset, inputs=[], outputs=[diag_html])
+        diag_export_btn.click(fn=on_diag_export, inputs=[diag_format], outputs=[diag_export])
+        
         # Store for tab events
         self.model_selector = model_selector
         self.stats_html = stats_html
@@ -502,13 +679,92 @@ class ModelManagerPlugin(WAN2GPPlugin):
         self.view_mode = view_mode
         self.list_html = list_html
         self.list_selection = list_selection
-        self.on_tab_outputs = [model_selector, stats_html, type_filter, status_box, list_html, list_selection]
+        self.list_page = list_page
+        self.size_table = size_table
+        self.on_tab_outputs = [model_selector, stats_html, type_filter, status_box, list_html, list_selection, list_page, size_table,
+                               sizes_version]
 
-    def on_tab_select(self, state):
-        """Auto refresh on tab select."""
-        models = self.scan_models()
-        choices, filtered = self.render_model_list(models, "size", "", "All")
+    def stream_scan_updates(self, sort_by, search_q, type_f, is_list, force=False, page=None):
+        """Generator handler body: yield UI updates while the scan is running, then the final sorted view.
+        
+        Sessions refreshing at the same time follow one shared scan; the partial list is local to each.
+        """
+        job = self.request_scan(force)
+        matches = self.scan_preview_filter(search_q, type_f)
+        shown = []
+        total_size = 0
+        rendered = 0
+        for batch in job.iter_batches():
+            batch = [m for m in batch if matches(m)]
+            shown.extend(batch)
+            total_size += sum(m.size for m in batch)
+            # Grid choices can only be replaced as a whole: re-render each time the list has doubled,
+            # so the streamed payload stays linear in the number of models
+            render = len(shown) >= 2 * rendered
+            if render:
+                rendered = len(shown)
+            yield self.build_scan_preview(shown, total_size, is_list, render)
+        yield self.build_scan_update(job.wait().models, sort_by, search_q, type_f, is_list, page)
+
+    def scan_preview_filter(self, search_q, type_f):
+        """Plain predicate matching the catalog filters, for partial scan results that have no catalog."""
+        query = (search_q or "").lower().strip()
+        paths = self.duplicate_paths if type_f == DUPLICATES_FILTER else None
+        
+        def matches(m):
+            if type_f and type_f != "All":
+                if paths is not None:
+                    if m.path not in paths:
+                        return False
+                elif m.model_type != type_f:
+                    return False
+            return not query or query in (m.name + "\n" + m.rel_path).lower()
+        return matches
+
+    def build_scan_preview(self, shown, total_size, is_list, render):
+        """Same outputs as build_scan_update for a scan in progress: models in discovery order, no sorting,
+        no catalog and no type choices; the list itself only when render is set."""
+        stats = self.get_stats_html(shown, set(), True, total_size)
+        status = f"⏳ Scanning... {len(shown)} models found"
+        if not render:
+            return (gr.update(), stats, gr.update(), status, gr.update(), gr.update(), gr.update(), gr.update(), gr.update())
+        if is_list:
+            return (gr.update(value=[], visible=False), stats, gr.update(), status,
+                    gr.update(value=self.render_list_page(shown, set()), visible=True), "[]", gr.update(), gr.update(),
+                    gr.update())
+        choices = [(f"{m.type_icon} {m.name} | {m.size_str}", m.path) for m in shown]
+        return (gr.update(choices=choices, value=[], visible=True), stats, gr.update(), status,
+                gr.update(visible=False), "[]", gr.update(), gr.update(), gr.update())
+
+    def build_scan_update(self, models, sort_by, search_q, type_f, is_list, page=None):
+        """Outputs: model_selector, stats_html, type_filter, status_box, list_html, list_selection, list_page, size_table,
+        sizes_version.
+        
+        page is the current list_page value, when the caller has it.
+        """
         types = self.get_unique_types(models)
-        stats = self.get_stats_html(filtered, [])
-        return gr.update(choices=choices, value=[]), stats, gr.update(choices=types), "", gr.update(visible=False), "[]"
+        status = ""
+        sizes = self.size_table_update(None)
+        if is_list:
+            list_update, filtered, page_out = self.reset_list(models, set(), sort_by, search_q, type_f, page)
+            stats = self.get_stats_html(filtered, set())
+            return (gr.update(value=[], visible=False), 
+                    stats, gr.update(choices=types), status,
+                    list_update, "[]", page_out, *sizes)
+        choices, filtered = self.render_model_list(models, sort_by, search_q, type_f)
+        stats = self.get_stats_html(filtered, set())
+        return (gr.update(choices=choices, value=[], visible=True), 
+                stats, gr.update(choices=types), status,
+                gr.update(visible=False), "[]", gr.update(), *sizes)
 
+    def on_tab_select(self, state):
+        """Auto refresh on tab select, streaming results as the scan progresses."""
+        models = self.models_cache
+        if self.watcher is not None and self.watcher.running and models:
+            # The watcher keeps the catalog current, no need to walk the disk; edited type rules
+            # only re-classify it
+            if self.reload_type_rules():
+                models = self.models_cache
+            yield self.build_scan_update(models, "size", "", "All", False)
+            return
+        yield from self.stream_scan_updates("size", "", "All", False)
@@ -0,0 +1,93 @@
+import os
+import time
+import heapq
+
+
+DAY = 86400
+
+
+class PrunePolicy:
+    """Picks models to evict from each checkpoints root.
+
+    budgets maps a root (as configured) to a byte budget; budget applies to every other root.
+    Roots over budget evict their least recently used files first (the usage log, or the file's
+    modification time for models never loaded, so fresh downloads are not evicted right away),
+    larger files first on ties. Eviction is a heap over the candidates of each root, so only the
+    files actually evicted are sorted.
+
+    unused_days keeps anything used in the last N days. Without a budget it is a rule of its own:
+    every candidate idle for longer is evicted. protect_types and min_size exclude files from
+    eviction but they still count against the budget.
+
+    Hardlinked paths are evicted together (deleting one link frees nothing), and only when every
+    link is a candidate.
+    """
+
+    def __init__(self, budget=None, budgets=None, unused_days=None, protect_types=(), min_size=0):
+        self.budget = budget
+        self.budgets = {os.path.abspath(root): size for root, size in (budgets or {}).items()}
+        self.unused_days = unused_days
+        self.protect_types = set(protect_types)
+        self.min_size = min_size
+
+    def is_active(self):
+        return self.budget is not None or bool(self.budgets) or self.unused_days is not None
+
+    def budget_for(self, base_dir):
+        return self.budgets.get(os.path.abspath(base_dir), self.budget)
+
+    def last_used(self, m, usage):
+        stats = usage.get(m.path) if usage is not None else None
+        return stats[1] if stats else m.mtime
+
+    def plan(self, models, usage=None, eligible=None, now=None):
+        """Return {"evict": [model rows], "roots": {base_dir: summary}} without touching any file.
+
+        eligible optionally restricts the candidates to a set of paths (e.g. a search result);
+        budgets are always measured against every model of the root.
+        """
+        now = time.time() if now is None else now
+        idle_before = now - self.unused_days * DAY if self.unused_days is not None else None
+
+        # Group paths per root and per file, so hardlinks are accounted once
+        roots = {}
+        for m in models:
+            file_id = (m.dev, m.ino) if m.ino else m.path
+            roots.setdefault(m.base_dir, {}).setdefault(file_id, []).append(m)
+
+        evict = []
+        summary = {}
+        for base_dir, files in roots.items():
+            budget = self.budget_for(base_dir)
+            total = sum(links[0].size for links in files.values())
+            heap = []
+            for links in files.values():
+                if not all(self.is_candidate(m, eligible) for m in links):
+                    continue
+                last_used = max(self.last_used(m, usage) for m in links)
+                if idle_before is not None and last_used > idle_before:
+                    continue
+                heap.append((last_used, -links[0].size, links[0].path, links))
+            heapq.heapify(heap)
+
+            if budget is None:
+                need = 0 if idle_before is None else None
+            else:
+                need = total - budget
+            freed = 0
+            count = 0
+            while heap and (need is None or freed < need):
+                last_used, neg_size, _, links = heapq.heappop(heap)
+                reason = "over budget" if budget is not None else f"unused for {self.unused_days} days"
+                for m in links:
+                    evict.append(dict(m.as_dict(), last_used=last_used, reason=reason))
+                freed -= neg_size
+                count += len(links)
+            summary[base_dir] = {"size": total, "budget": budget, "freed": freed, "files": count,
+                                 "over_budget": budget is not None and total - freed > budget}
+        return {"evict": evict, "roots": summary}
+
+    def is_candidate(self, m, eligible):
+        if m.model_type in self.protect_types or m.size < self.min_size:
+            return False
+        return eligible is None or m.path in eligible
@@ -0,0 +1,112 @@
+import os
+import sys
+from datetime import datetime
+
+
+# (name, color, icon) of every model type seen so far; records store an index into this table
+MODEL_TYPES = []
+TYPE_CODES = {}
+
+
+def type_code(model_type, color, icon):
+    """Small-int code of a (name, color, icon) type, registered on first use."""
+    key = (model_type, color, icon)
+    code = TYPE_CODES.get(key)
+    if code is None:
+        code = TYPE_CODES[key] = len(MODEL_TYPES)
+        MODEL_TYPES.append(key)
+    return code
+
+
+def type_colors():
+    return {name: color for name, color, _ in MODEL_TYPES}
+
+
+def format_size(size_bytes):
+    if size_bytes < 1024:
+        return f"{size_bytes} B"
+    elif size_bytes < 1024 ** 2:
+        return f"{size_bytes / 1024:.1f} KB"
+    elif size_bytes < 1024 ** 3:
+        return f"{size_bytes / (1024 ** 2):.1f} MB"
+    else:
+        return f"{size_bytes / (1024 ** 3):.2f} GB"
+
+
+class ModelRecord:
+    """One model file, kept small for catalogs of tens of thousands of files.
+
+    Only raw values are stored: directories and roots are shared (interned) strings, the type
+    is a code into MODEL_TYPES and meta is the header dict held by the scan index. Paths and
+    display strings (size, date, type color/icon) are derived on access, so they are only
+    built for rows that are actually rendered or exported.
+    """
+
+    __slots__ = ("name", "dir", "base_dir", "root", "size", "mtime", "type_code", "meta", "alloc", "dev", "ino", "nlink")
+
+    FIELDS = ("name", "path", "rel_path", "base_dir", "model_type", "size", "size_str", "alloc", "modified",
+              "mtime", "params", "precision", "dev", "ino")
+
+    def __init__(self, name, dir_path, base_dir, root, size, mtime, code, meta, alloc, dev, ino, nlink=1):
+        self.name = name
+        self.dir = sys.intern(dir_path)
+        self.base_dir = base_dir
+        self.root = root
+        self.size = size
+        self.mtime = mtime
+        self.type_code = code
+        self.meta = meta
+        self.alloc = alloc
+        self.dev = dev
+        self.ino = ino
+        self.nlink = nlink
+
+    @property
+    def path(self):
+        return os.path.join(self.dir, self.name)
+
+    @property
+    def rel_path(self):
+        if self.dir == self.root:
+            return self.name
+        return os.path.join(self.dir[len(os.path.join(self.root, "")):], self.name)
+
+    @property
+    def model_type(self):
+        return MODEL_TYPES[self.type_code][0]
+
+    @property
+    def type_color(self):
+        return MODEL_TYPES[self.type_code][1]
+
+    @property
+    def type_icon(self):
+        return MODEL_TYPES[self.type_code][2]
+
+    @property
+    def size_str(self):
+        return format_size(self.size)
+
+    @property
+    def modified(self):
+        return datetime.fromtimestamp(self.mtime).strftime("%Y-%m-%d %H:%M")
+
+    @property
+    def params(self):
+        return self.meta.get("params") if self.meta else None
+
+    @property
+    def precision(self):
+        return self.meta.get("precision") if self.meta else None
+
+    def retyped(self, code):
+        """Copy with another type code (records in a published snapshot are never modified)."""
+        return ModelRecord(self.name, self.dir, self.base_dir, self.root, self.size, self.mtime, code,
+                           self.meta, self.alloc, self.dev, self.ino, self.nlink)
+
+    def as_dict(self, fields=FIELDS):
+        """Plain dict of the given fields, for JSON/CSV export."""
+        return {f: getattr(self, f) for f in fields}
+
+    def __repr__(self):
+        return f"ModelRecord({self.path!r}, {self.size})"
@@ -0,0 +1,64 @@
+import os
+import json
+import time
+
+
+class ScanIndex:
+    """On-disk cache of directory listings used to avoid re-walking unchanged model folders."""
+
+    VERSION = 4
+
+    def __init__(self, index_file):
+        self.index_file = index_file
+        self.dirs = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        self.dirs = {}
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION:
+                self.dirs = data.get("dirs", {})
+        except (OSError, ValueError):
+            pass
+        self.dirty = False
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_file = self.index_file + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"version": self.VERSION, "dirs": self.dirs}, f, separators=(",", ":"))
+            os.replace(tmp_file, self.index_file)
+            self.dirty = False
+        except OSError:
+            pass
+
+    def get_dir(self, dir_path, dir_mtime):
+        """Return the cached listing of a directory if its mtime is unchanged."""
+        entry = self.dirs.get(dir_path)
+        if entry is not None and entry["mtime"] == dir_mtime:
+            return entry
+        return None
+
+    def set_dir(self, dir_path, dir_mtime, subdirs, files):
+        """Store a directory listing.
+
+        files maps filename -> [size, mtime_ns, inode, header metadata, allocated bytes, device, link count].
+        listed is when the listing was made, to tell files that may still be written from settled ones.
+        """
+        self.dirs[dir_path] = {"mtime": dir_mtime, "dirs": subdirs, "files": files, "listed": time.time_ns()}
+        self.dirty = True
+
+    def prune(self, visited_dirs, scan_roots):
+        """Drop entries under scanned roots that were not visited (deleted or hidden dirs)."""
+        prefixes = tuple(os.path.join(r, "") for r in scan_roots)
+        stale = [d for d in self.dirs
+                 if d not in visited_dirs and (d in scan_roots or d.startswith(prefixes))]
+        for d in stale:
+            del self.dirs[d]
+        if stale:
+            self.dirty = True
@@ -0,0 +1,105 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class ModelScanner:
+    """Parallel directory walker built on os.scandir.
+
+    Every directory listing is a separate task on a bounded thread pool, so subfolders and
+    separate checkpoints roots (other disks, network shares) are listed concurrently.
+    """
+
+    def __init__(self, scan_index, model_extensions, max_workers=8, inspect=None, settle_time=120.0):
+        self.scan_index = scan_index
+        self.model_extensions = tuple(model_extensions)
+        self.max_workers = max_workers
+        # Files modified this long before their folder was listed are considered fully written
+        self.settle_ns = int(settle_time * 1e9)
+        # Optional path -> metadata callable, run once per new or changed file on the worker threads
+        self.inspect = inspect
+
+    def list_dir(self, dir_path, force=False):
+        """List model files and subdirectories of one directory, reusing the scan index when unchanged."""
+        dir_mtime = os.stat(dir_path).st_mtime_ns
+        entry = None if force else self.scan_index.get_dir(dir_path, dir_mtime)
+        if entry is not None:
+            files = self.revalidate(dir_path, entry)
+            if files is not None:
+                self.scan_index.set_dir(dir_path, dir_mtime, entry["dirs"], files)
+                return entry["dirs"], files
+            return entry["dirs"], entry["files"]
+
+        old_entry = self.scan_index.dirs.get(dir_path)
+        old_files = old_entry["files"] if old_entry else {}
+        subdirs = []
+        files = {}
+        with os.scandir(dir_path) as it:
+            for de in it:
+                if de.is_dir(follow_symlinks=False):
+                    if not de.name.startswith('.'):
+                        subdirs.append(de.name)
+                elif os.path.splitext(de.name)[1].lower() in self.model_extensions:
+                    try:
+                        stat = de.stat()
+                    except OSError:
+                        continue
+                    files[de.name] = self.file_info(de.path, stat, old_files.get(de.name))
+        subdirs.sort()
+        self.scan_index.set_dir(dir_path, dir_mtime, subdirs, files)
+        return subdirs, files
+
+    def file_info(self, path, stat, old):
+        """Index entry [size, mtime_ns, inode, meta, allocated, device, links], keeping old's metadata if unchanged."""
+        if old is not None and old[:3] == [stat.st_size, stat.st_mtime_ns, stat.st_ino]:
+            meta = old[3]
+        else:
+            meta = self.inspect(path) if self.inspect else None
+        alloc = stat.st_blocks * 512 if hasattr(stat, "st_blocks") else stat.st_size
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino, meta, alloc, stat.st_dev, stat.st_nlink]
+
+    def revalidate(self, dir_path, entry):
+        """Re-stat the files of a reused listing that were still being written when it was made.
+
+        The directory mtime only changes when entries are added, removed or renamed, so a file
+        growing in place (a download in progress) is only caught by its own stat. Only files
+        modified within settle_time of the listing are checked; files that had settled are
+        trusted, and later in-place rewrites are left to the watcher and the forced refresh.
+        Returns the updated files to store (with a new listing time), or None to reuse the entry.
+        """
+        cached = entry["files"]
+        recent = entry.get("listed", 0) - self.settle_ns
+        names = [name for name, info in cached.items() if info[1] >= recent]
+        if not names:
+            return None
+        changed = dict(cached)
+        for name in names:
+            info = cached[name]
+            path = os.path.join(dir_path, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stat = None
+            if stat is None:
+                del changed[name]
+            elif info[:3] != [stat.st_size, stat.st_mtime_ns, stat.st_ino]:
+                changed[name] = self.file_info(path, stat, info)
+        return changed
+
+    def iter_listings(self, roots, force=False):
+        """Yield (root_idx, dir_path, files) for every directory under roots, in completion order."""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mm-scan") as pool:
+            pending = {}
+            for root_idx, root in enumerate(roots):
+                pending[pool.submit(self.list_dir, root, force)] = (root_idx, root)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    root_idx, dir_path = pending.pop(fut)
+                    try:
+                        subdirs, files = fut.result()
+                    except OSError:
+                        continue
+                    for d in subdirs:
+                        sub_path = os.path.join(dir_path, d)
+                        pending[pool.submit(self.list_dir, sub_path, force)] = (root_idx, sub_path)
+                    yield root_idx, dir_path, files
@@ -0,0 +1,73 @@
+import threading
+
+
+class CatalogSnapshot:
+    """One published scan result: models, their catalog and the disk-usage rankings.
+
+    A snapshot is never modified after it is published (the catalog only fills its lazy
+    indexes). Writers build a new one and swap the reference, so a reader takes
+    core.snapshot once and uses it for the whole request without any lock.
+    """
+
+    def __init__(self, version, models, catalog, disk_totals=(0, 0, 0, 0), disk_rankings=None):
+        self.version = version
+        self.models = models
+        self.catalog = catalog
+        self.disk_totals = disk_totals
+        self.disk_rankings = disk_rankings or {}
+
+    def top(self, kind, n=10):
+        """Top n (key, apparent, allocated, files) rows of "root", "type" or "dir"."""
+        return self.disk_rankings.get(kind, [])[:n]
+
+
+class ScanJob:
+    """A scan running on its own thread that any number of callers can follow.
+
+    Batches are kept so callers that join late replay the progress from the start.
+    """
+
+    def __init__(self, force=False):
+        self.force = force
+        self.batches = []
+        self.done = False
+        self.snapshot = None
+        self.error = None
+        self.cond = threading.Condition()
+
+    def add_batch(self, batch):
+        with self.cond:
+            self.batches.append(batch)
+            self.cond.notify_all()
+
+    def finish(self, snapshot=None, error=None):
+        with self.cond:
+            self.snapshot = snapshot
+            self.error = error
+            self.done = True
+            self.cond.notify_all()
+
+    def iter_batches(self):
+        """Yield every batch found so far, then new ones as they arrive, until the scan ends."""
+        pos = 0
+        while True:
+            with self.cond:
+                while pos >= len(self.batches) and not self.done:
+                    self.cond.wait()
+                batches = self.batches[pos:]
+                pos = len(self.batches)
+                done = self.done
+            yield from batches
+            if done and pos >= len(self.batches):
+                break
+        if self.error is not None:
+            raise self.error
+
+    def wait(self):
+        """Block until the scan ends and return the snapshot it published."""
+        with self.cond:
+            while not self.done:
+                self.cond.wait()
+        if self.error is not None:
+            raise self.error
+        return self.snapshot
@@ -0,0 +1,260 @@
+import os
+import re
+import json
+import threading
+from bisect import bisect_left, bisect_right
+from .records import type_code
+
+
+GB = 1024 ** 3
+
+# name -> (color, icon)
+BUILTIN_TYPES = {
+    "Checkpoint": ("#3b82f6", "🔷"),
+    "Model": ("#60a5fa", "📦"),
+    "LoRA": ("#22c55e", "🎨"),
+    "VAE": ("#a855f7", "🎭"),
+    "Text Encoder": ("#f97316", "📝"),
+    "LLM": ("#06b6d4", "🧠"),
+    "Upscaler": ("#ec4899", "⬆️"),
+    "Depth": ("#8b5cf6", "🌊"),
+    "Audio": ("#f59e0b", "🔊"),
+    "Segmentation": ("#84cc16", "✂️"),
+}
+DEFAULT_COLOR = "#9ca3af"
+DEFAULT_ICON = "📦"
+
+DIFFUSION_FAMILIES = ["wan2", "ltx", "flux", "hunyuan"]
+
+# Checked in order, the first matching rule wins. Same schema as the "rules" of model_types.json.
+BUILTIN_RULES = [
+    # The safetensors header, when readable, beats any filename heuristic
+    {"type": "Checkpoint", "kind": "Diffusion", "min_gb": 5},
+    {"type": "Model", "kind": "Diffusion"},
+    {"type": "LoRA", "kind": "LoRA"},
+    {"type": "VAE", "kind": "VAE"},
+    {"type": "Text Encoder", "kind": "Text Encoder"},
+    {"type": "LLM", "kind": "LLM"},
+    {"type": "Upscaler", "kind": "Upscaler"},
+    {"type": "LoRA", "match": "path", "contains": ["lora"]},
+    {"type": "VAE", "contains": ["vae"]},
+    {"type": "Text Encoder", "contains": ["clip", "text_encoder", "t5", "umt5", "xlm", "roberta"]},
+    {"type": "LLM", "contains": ["llama", "qwen", "gemma", "caption", "joycaption"]},
+    {"type": "Upscaler", "contains": ["upscal", "esrgan", "swinir", "flashvsr"]},
+    {"type": "Depth", "contains": ["depth", "midas"]},
+    {"type": "Audio", "contains": ["audio", "mmaudio", "roformer"]},
+    {"type": "Segmentation", "regex": r"(?:^|[^a-z])sam\d*(?:[^a-z]|$)|segment"},
+    {"type": "Checkpoint", "contains": DIFFUSION_FAMILIES, "min_gb": 5},
+    {"type": "Model", "contains": DIFFUSION_FAMILIES},
+    {"type": "Checkpoint", "min_gb": 10},
+    # Small files without a readable header: only call them LoRAs when nothing says otherwise
+    {"type": "LoRA", "max_gb": 0.5, "header": False},
+    {"type": "Model"},
+]
+
+
+class TypeRule:
+    """One parsed rule: patterns on the lowercased name (or path) plus optional conditions."""
+
+    __slots__ = ("code", "patterns", "on_path", "kind", "header", "min_size", "max_size")
+
+    def __init__(self, spec, types):
+        name = spec["type"]
+        color, icon = types.get(name, (DEFAULT_COLOR, DEFAULT_ICON))
+        self.code = type_code(name, color, icon)
+        # (pattern, standalone) pairs, any of which matches: the escaped "contains" substrings and
+        # the user regex stay apart, so the regex's inline flags still lead its own pattern
+        self.patterns = []
+        if spec.get("contains"):
+            self.patterns.append(("|".join(re.escape(s.lower()) for s in spec["contains"]), False))
+        if spec.get("regex"):
+            pattern = spec["regex"]
+            # Report a bad pattern when loading, not on the first file it is tried on
+            groups = re.compile(pattern).groups
+            # Capture groups (and backreferences to them) would be renumbered or clash with other
+            # rules' in a combined regex; so would inline flags. Such patterns get a regex of their own.
+            try:
+                re.compile(f"(?P<_r0>.*?(?:{pattern}))")
+                standalone = groups > 0
+            except re.error:
+                standalone = True
+            self.patterns.append((pattern, standalone))
+        match = spec.get("match", "name")
+        if match not in ("name", "path"):
+            raise ValueError(f"match must be 'name' or 'path', not {match!r}")
+        self.on_path = match == "path"
+        self.kind = spec.get("kind")
+        self.header = spec.get("header")
+        self.min_size = spec["min_gb"] * GB if spec.get("min_gb") is not None else None
+        self.max_size = spec["max_gb"] * GB if spec.get("max_gb") is not None else None
+
+
+class TypeRules:
+    """Model type classification from an ordered rule list, built-in or loaded from a JSON file.
+
+    Rules are grouped by the conditions that do not depend on the name (header kind, header
+    present, size thresholds). Each group compiles lazily into one combined regex per subject
+    (name, path): an alternation of ".*?(?:pattern)" in priority order, so one match() call, run
+    entirely inside the regex engine, returns the first rule whose pattern occurs anywhere in the
+    name. Patterns with their own capture groups or inline flags cannot be combined and are
+    searched separately, at their place in the order. The rule a file falls through to is the
+    first one without a pattern.
+
+    Results are memoized per directory and file name for the same size and header, so rescans
+    and watcher updates only classify new or changed files. Editing the rules file clears the
+    memo; the catalog is re-classified from memory without walking the disk. The scan and watcher
+    threads classify concurrently, so the memo and the compiled groups change under a lock.
+    """
+
+    def __init__(self, rules_file=None):
+        self.rules_file = rules_file
+        self.file_stamp = None
+        self.error = None
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """(Re)read the rules file; on any error the built-in rules are used and error is set."""
+        self.file_stamp = self.stamp()
+        self.error = None
+        config = {}
+        if self.file_stamp is not None:
+            try:
+                with open(self.rules_file, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+            except (OSError, ValueError) as e:
+                self.error = f"{self.rules_file}: {e}"
+        try:
+            rules = self.parse(config)
+        except (KeyError, TypeError, ValueError, re.error) as e:
+            self.error = f"{self.rules_file}: bad rule: {e}"
+            rules = self.parse({})
+        if self.error:
+            print(f"[Model Manager] Using built-in type rules, {self.error}")
+
+        with self.lock:
+            self.rules = rules
+            self.min_sizes = sorted({r.min_size for r in rules if r.min_size is not None})
+            self.max_sizes = sorted({r.max_size for r in rules if r.max_size is not None})
+            self.groups = {}
+            self.memo = {}
+
+    def parse(self, config):
+        types = dict(BUILTIN_TYPES)
+        for name, spec in config.get("types", {}).items():
+            types[name] = (spec.get("color", DEFAULT_COLOR), spec.get("icon", DEFAULT_ICON))
+        specs = list(config.get("rules", []))
+        if config.get("builtin", True):
+            specs.extend(BUILTIN_RULES)
+        return [TypeRule(spec, types) for spec in specs]
+
+    def stamp(self):
+        if not self.rules_file:
+            return None
+        try:
+            st = os.stat(self.rules_file)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def reload_if_changed(self):
+        """Reload when the rules file was created, edited or removed. Returns True if it was."""
+        if self.stamp() == self.file_stamp:
+            return False
+        self.load()
+        return True
+
+    def group_for(self, kind, has_header, size):
+        key = (kind, has_header, bisect_left(self.min_sizes, size), bisect_right(self.max_sizes, size))
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = self.compile_group(kind, has_header, size)
+        return group
+
+    def compile_group(self, kind, has_header, size):
+        """(name regexes, folder regexes, rule codes by priority, fallback code, folder ranks) for one condition set."""
+        name_parts = []
+        dir_parts = []
+        codes = []
+        fallback = type_code("Model", *BUILTIN_TYPES["Model"])
+        for rule in self.rules:
+            if rule.kind is not None and rule.kind != kind:
+                continue
+            if rule.header is not None and rule.header != has_header:
+                continue
+            if rule.min_size is not None and not size > rule.min_size:
+                continue
+            if rule.max_size is not None and not size < rule.max_size:
+                continue
+            if not rule.patterns:
+                fallback = rule.code
+                break
+            parts = [(len(codes), pattern, standalone) for pattern, standalone in rule.patterns]
+            name_parts.extend(parts)
+            if rule.on_path:
+                dir_parts.extend(parts)
+            codes.append(rule.code)
+
+        def combine(parts):
+            """Regexes in priority order: runs of ordinary rules are joined, standalone rules kept apart."""
+            compiled = []
+            run = []
+            for part in parts + [None]:
+                if part is not None and not part[2]:
+                    run.append(part)
+                    continue
+                if run:
+                    pattern = re.compile("(?s)" + "|".join(f"(?P<_r{i}>.*?(?:{p[1]}))" for i, p in enumerate(run)))
+                    # Group number -> priority, for m.lastindex (a rule may own several groups)
+                    priority = {pattern.groupindex[f"_r{i}"]: p[0] for i, p in enumerate(run)}
+                    compiled.append((pattern, priority))
+                    run = []
+                if part is not None:
+                    compiled.append((re.compile(part[1], re.S), part[0]))
+            return compiled or None
+        return combine(name_parts), combine(dir_parts), codes, fallback, {}
+
+    def best_match(self, compiled, text, default):
+        """Priority of the first rule of compiled whose pattern occurs in text, else default."""
+        for pattern, priority in compiled:
+            if isinstance(priority, dict):
+                m = pattern.match(text)
+                if m:
+                    return priority[m.lastindex]
+            elif pattern.search(text):
+                return priority
+        return default
+
+    def classify(self, filename, dir_path, size, meta):
+        """Type code (see records.MODEL_TYPES) of a model file."""
+        # Also keeps a result computed with the old rules out of the memo of a reload
+        with self.lock:
+            return self.classify_locked(filename, dir_path, size, meta)
+
+    def classify_locked(self, filename, dir_path, size, meta):
+        memo = self.memo.get(dir_path)
+        if memo is not None:
+            hit = memo.get(filename)
+            if hit is not None and hit[0] == size and hit[1] is meta:
+                return hit[2]
+        else:
+            memo = self.memo[dir_path] = {}
+
+        name_re, dir_re, codes, fallback, dir_ranks = self.group_for(meta.get("kind") if meta else None, bool(meta), size)
+        best = len(codes)
+        if name_re is not None:
+            best = self.best_match(name_re, filename.lower(), best)
+        if dir_re is not None:
+            # "path" rules also match the folders; their result is shared by every file of a folder
+            rank = dir_ranks.get(dir_path)
+            if rank is None:
+                rank = dir_ranks[dir_path] = self.best_match(dir_re, dir_path.lower(), len(codes))
+            best = min(best, rank)
+        code = codes[best] if best < len(codes) else fallback
+        memo[filename] = (size, meta, code)
+        return code
+
+    def retain(self, dir_paths):
+        """Forget memoized results outside dir_paths (after a full scan)."""
+        with self.lock:
+            self.memo = {d: memo for d, memo in self.memo.items() if d in dir_paths}
@@ -0,0 +1,236 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import functools
+from collections import deque
+
+
+# Modules that import the loaders by name ("from safetensors.torch import load_file"), so
+# patching the library alone would miss their calls. Other modules are left untouched.
+REBIND_MODULES = ("wgp", "mmgp.offload", "mmgp.safetensors2")
+
+
+class UsageHookMeta(type):
+    """Metaclass of a class proxy: isinstance/issubclass checks against it see the original class."""
+
+    def __instancecheck__(cls, obj):
+        return isinstance(obj, cls._mm_original)
+
+    def __subclasscheck__(cls, subclass):
+        return issubclass(subclass, cls._mm_original)
+
+
+class UsageRecorder:
+    """Records model loads with near-zero overhead on the caller's thread.
+
+    record() only appends to an in-memory queue. A background thread appends batches to a
+    JSONL write-ahead log and compacts it into per-path counts and last-used timestamps
+    (model_usage.json) every compact_every lines, every compact_interval seconds and at exit.
+    get() is an O(1) dict lookup for the list view.
+    """
+
+    def __init__(self, usage_file, model_extensions, flush_interval=5.0, compact_every=1000, dedup_window=60.0,
+                 compact_interval=600.0):
+        self.usage_file = usage_file
+        self.log_file = os.path.splitext(usage_file)[0] + ".log"
+        self.model_extensions = tuple(model_extensions)
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        self.dedup_window = dedup_window
+        self.compact_interval = compact_interval
+        self.last_compact = time.monotonic()
+        self.queue = deque()
+        self.stats = {}
+        self.last_seen = {}
+        self.log_lines = 0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.hooks_installed = False
+        self.load()
+
+    def load(self):
+        """Load compacted stats and replay any log written since the last compaction."""
+        stats = {}
+        try:
+            with open(self.usage_file, "r", encoding="utf-8") as f:
+                for path, (count, last_used) in json.load(f).items():
+                    stats[path] = [count, last_used]
+        except (OSError, ValueError, TypeError):
+            pass
+        lines = 0
+        try:
+            with open(self.log_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.apply_event(stats, event["p"], event["t"])
+                    lines += 1
+        except OSError:
+            pass
+        self.stats = stats
+        self.log_lines = lines
+
+    @staticmethod
+    def apply_event(stats, path, ts):
+        entry = stats.get(path)
+        if entry is None:
+            stats[path] = [1, ts]
+        else:
+            entry[0] += 1
+            if ts > entry[1]:
+                entry[1] = ts
+
+    def get(self, path):
+        """Return (count, last_used_timestamp) or None if the model was never used."""
+        return self.stats.get(path)
+
+    def record(self, path):
+        """Queue a model load. Safe to call from any thread; does no I/O."""
+        try:
+            path = os.fspath(path)
+        except TypeError:
+            return
+        if not isinstance(path, str) or not path.lower().endswith(self.model_extensions):
+            return
+        self.queue.append((path, time.time()))
+        if self.thread is None:
+            self.start()
+        elif len(self.queue) >= 256:
+            self.wakeup.set()
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self.run, name="mm-usage", daemon=True)
+            self.thread.start()
+            atexit.register(self.shutdown)
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.flush_interval)
+            self.wakeup.clear()
+            self.flush()
+            if self.log_lines and time.monotonic() - self.last_compact >= self.compact_interval:
+                with self.lock:
+                    self.compact()
+
+    def shutdown(self):
+        """Flush pending events and fold the log into usage_file, so the next start reads no log."""
+        self.flush()
+        with self.lock:
+            if self.log_lines:
+                self.compact()
+
+    def flush(self):
+        """Append queued events to the log and fold them into the in-memory stats."""
+        with self.lock:
+            events = []
+            while self.queue:
+                path, ts = self.queue.popleft()
+                path = os.path.abspath(path)
+                # A single model load often opens the same file several times
+                last = self.last_seen.get(path)
+                self.last_seen[path] = ts
+                if last is not None and ts - last < self.dedup_window:
+                    continue
+                events.append((path, ts))
+            if len(self.last_seen) > 256:
+                # Entries outside the window can no longer suppress anything
+                horizon = time.time() - self.dedup_window
+                self.last_seen = {p: t for p, t in self.last_seen.items() if t >= horizon}
+            if not events:
+                return
+            try:
+                with open(self.log_file, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps({"p": p, "t": t}) + "\n" for p, t in events))
+            except OSError:
+                pass
+            for path, ts in events:
+                self.apply_event(self.stats, path, ts)
+            self.log_lines += len(events)
+            if self.log_lines >= self.compact_every:
+                self.compact()
+
+    def compact(self):
+        """Write aggregated stats to usage_file and truncate the log. Caller holds the lock."""
+        self.last_compact = time.monotonic()
+        tmp_file = self.usage_file + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(self.stats, f, separators=(",", ":"))
+            os.replace(tmp_file, self.usage_file)
+            open(self.log_file, "w").close()
+            self.log_lines = 0
+        except OSError:
+            pass
+
+    def record_call(self, args, kwargs):
+        if args:
+            self.record(args[0])
+        else:
+            self.record(kwargs.get("filename", kwargs.get("f")))
+
+    def wrap(self, func):
+        recorder = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder.record_call(args, kwargs)
+            return func(*args, **kwargs)
+
+        wrapper._mm_usage_wrapped = True
+        return wrapper
+
+    def wrap_class(self, cls):
+        """Class proxy for a loader class (safetensors.safe_open): calling it records the load and
+        returns an instance of the original class; isinstance checks keep working."""
+        recorder = self
+
+        def __new__(proxy, *args, **kwargs):
+            recorder.record_call(args, kwargs)
+            return cls(*args, **kwargs)
+
+        return UsageHookMeta(cls.__name__, (), {
+            "__new__": __new__, "__doc__": cls.__doc__, "__module__": cls.__module__,
+            "__qualname__": getattr(cls, "__qualname__", cls.__name__),
+            "_mm_original": cls, "_mm_usage_wrapped": True,
+        })
+
+    def install_hooks(self):
+        """Wrap the common checkpoint loaders (safetensors, torch.load).
+
+        Only already-imported libraries are patched (Wan2GP imports them before plugins are set up);
+        the REBIND_MODULES that imported the loaders by name get their reference replaced too.
+        safe_open is a class, so it is replaced by a class proxy rather than a function.
+        """
+        if self.hooks_installed:
+            return
+        self.hooks_installed = True
+        targets = [("safetensors", "safe_open"), ("safetensors.torch", "load_file"), ("torch", "load")]
+        replaced = {}
+        for module_name, attr in targets:
+            module = sys.modules.get(module_name)
+            if module is None:
+                continue
+            original = getattr(module, attr, None)
+            if original is None or getattr(original, "_mm_usage_wrapped", False):
+                continue
+            wrapper = self.wrap_class(original) if isinstance(original, type) else self.wrap(original)
+            setattr(module, attr, wrapper)
+            replaced[id(original)] = (attr, original, wrapper)
+        if not replaced:
+            return
+        for module_name in REBIND_MODULES:
+            module = sys.modules.get(module_name)
+            if module is None:
+                continue
+            for attr, original, wrapper in replaced.values():
+                if getattr(module, attr, None) is original:
+                    setattr(module, attr, wrapper)
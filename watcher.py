@@ -0,0 +1,276 @@
+import os
+import time
+import errno
+import select
+import struct
+import threading
+import ctypes
+import ctypes.util
+
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyBackend:
+    """Linux inotify through libc, one watch per model directory."""
+
+    name = "inotify"
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.fd = fd
+        self.wd_to_dir = {}
+        self.dir_to_wd = {}
+        self.lock = threading.Lock()
+
+    def add_watch(self, dir_path):
+        with self.lock:
+            if dir_path in self.dir_to_wd:
+                return
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dir_path), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached")
+                return
+            # Same wd for another path: the folder was moved here without us seeing it leave
+            moved_from = self.wd_to_dir.get(wd)
+            if moved_from is not None:
+                self.dir_to_wd.pop(moved_from, None)
+            self.wd_to_dir[wd] = dir_path
+            self.dir_to_wd[dir_path] = wd
+
+    def drop_watches(self, dir_path):
+        """Stop watching dir_path and every folder under it. Caller holds lock."""
+        prefix = os.path.join(dir_path, "")
+        for d in [d for d in self.dir_to_wd if d == dir_path or d.startswith(prefix)]:
+            wd = self.dir_to_wd.pop(d)
+            del self.wd_to_dir[wd]
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, timeout):
+        """Return (changed_dirs, overflow) for events received within timeout seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set(), False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set(), False
+        changed = set()
+        overflow = False
+        offset = 0
+        with self.lock:
+            while offset + EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, name_len = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size + name_len
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                dir_path = self.wd_to_dir.get(wd)
+                if dir_path is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self.wd_to_dir[wd]
+                    self.dir_to_wd.pop(dir_path, None)
+                elif mask & IN_MOVE_SELF:
+                    # The watches follow the moved inodes: free the old paths so a folder recreated
+                    # there gets watched again. The new location is picked up from its parent's
+                    # IN_MOVED_TO event, if it is still inside a model folder.
+                    self.drop_watches(dir_path)
+                changed.add(dir_path)
+        return changed, overflow
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class PollingBackend:
+    """Fallback that compares directory mtimes at a fixed interval (also works on network shares)."""
+
+    name = "poll"
+
+    def __init__(self, poll_interval=10.0):
+        self.poll_interval = poll_interval
+        self.dir_mtimes = {}
+        self.lock = threading.Lock()
+        self.next_poll = time.monotonic() + poll_interval
+
+    def add_watch(self, dir_path):
+        with self.lock:
+            if dir_path in self.dir_mtimes:
+                return
+            try:
+                self.dir_mtimes[dir_path] = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                pass
+
+    def read_events(self, timeout):
+        now = time.monotonic()
+        if now < self.next_poll:
+            time.sleep(min(timeout, self.next_poll - now))
+            return set(), False
+        self.next_poll = now + self.poll_interval
+        with self.lock:
+            dirs = list(self.dir_mtimes.items())
+        changed = set()
+        for dir_path, mtime in dirs:
+            try:
+                new_mtime = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                new_mtime = None
+            if new_mtime != mtime:
+                changed.add(dir_path)
+                with self.lock:
+                    if new_mtime is None:
+                        self.dir_mtimes.pop(dir_path, None)
+                    else:
+                        self.dir_mtimes[dir_path] = new_mtime
+        return changed, False
+
+    def close(self):
+        pass
+
+
+class ModelWatcher:
+    """Background thread that feeds debounced directory changes to a callback.
+
+    on_changes(dirs) is called with a list of changed directories, or None after an event
+    overflow (caller should resync). It returns (new_dirs, recheck_dirs): directories to start
+    watching, and directories holding files that may still be written and must be looked at again.
+    """
+
+    def __init__(self, on_changes, debounce=2.0, poll_interval=10.0, backend="auto"):
+        self.on_changes = on_changes
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.backend = self.create_backend(backend)
+        self.backend_lock = threading.Lock()
+        # Backends replaced by fall_back_to_polling, closed by the run thread (or stop)
+        self.retired = []
+        self.pending = {}
+        self.running = False
+        self.thread = None
+
+    def create_backend(self, backend):
+        if backend in ("auto", "inotify"):
+            try:
+                return InotifyBackend()
+            except (OSError, AttributeError):
+                if backend == "inotify":
+                    raise
+        return PollingBackend(self.poll_interval)
+
+    def watch_dirs(self, dir_paths):
+        for dir_path in dir_paths:
+            try:
+                self.backend.add_watch(dir_path)
+            except OSError:
+                # Out of inotify watches: degrade to polling for everything
+                self.fall_back_to_polling(dir_paths)
+                return
+
+    def fall_back_to_polling(self, dir_paths):
+        with self.backend_lock:
+            old = self.backend
+            if isinstance(old, PollingBackend):
+                # Another thread fell back first
+                backend = old
+            else:
+                backend = PollingBackend(self.poll_interval)
+                with old.lock:
+                    watched = list(getattr(old, "dir_to_wd", ()))
+                for d in watched:
+                    backend.add_watch(d)
+                self.backend = backend
+                # The run thread may be blocked reading the old backend's fd, or be inside dispatch
+                # waiting for the caller: it closes the old backend itself once it is done reading
+                # (closing the fd here could let its number be reused under the reader). Nothing
+                # joins the run thread, so a caller it waits for cannot deadlock with it.
+                self.retired.append(old)
+        for d in dir_paths:
+            backend.add_watch(d)
+
+    def start(self, dir_paths):
+        self.watch_dirs(dir_paths)
+        if self.running:
+            return
+        self.start_thread()
+
+    def start_thread(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name="mm-watcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+        self.close_retired()
+        self.backend.close()
+
+    def close_retired(self):
+        with self.backend_lock:
+            retired, self.retired = self.retired, []
+        for backend in retired:
+            backend.close()
+
+    def run(self):
+        while self.running:
+            self.close_retired()
+            try:
+                changed, overflow = self.backend.read_events(0.5)
+            except OSError:
+                time.sleep(1)
+                continue
+            now = time.monotonic()
+            if overflow:
+                self.pending.clear()
+                self.dispatch(None)
+                continue
+            for dir_path in changed:
+                self.pending[dir_path] = now
+            ready = [d for d, t in self.pending.items() if now - t >= self.debounce]
+            if ready:
+                for d in ready:
+                    del self.pending[d]
+                self.dispatch(ready)
+
+    def dispatch(self, dirs):
+        try:
+            new_dirs, recheck_dirs = self.on_changes(dirs)
+        except Exception as e:
+            print(f"[Model Manager] Watcher update failed: {e}")
+            return
+        if new_dirs:
+            self.watch_dirs(new_dirs)
+        now = time.monotonic()
+        for d in recheck_dirs or ():
+            self.pending[d] = now